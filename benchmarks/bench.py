@@ -0,0 +1,309 @@
+"""
+Benchmarks for the catmap map generators, mesh builders and figure export.
+
+    python benchmarks/bench.py                       # run and print a table
+    python benchmarks/bench.py --save base.json      # record a baseline
+    python benchmarks/bench.py --compare base.json   # compare against it
+    python benchmarks/bench.py -k gradient --sizes 100 1000
+
+Every case is timed --repeat times (median and best wall time) after one
+warm-up call, then run once more under tracemalloc for its peak memory:
+NumPy reports its array allocations to tracemalloc, so the peak covers the
+arrays a call creates. Random generators get a fixed seed and the gradient
+caches are bypassed, so each call does the full work.
+
+--compare prints each case's time against the baseline and marks changes
+beyond --tolerance; with --check the exit status is 1 if anything got
+slower by more than that.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+SIZES = (100, 500, 1000, 2000, 4000)
+QUICK_SIZES = (100, 500, 1000)
+SIGMAS = (2, 10)
+DISPERSIONS = (0.2, 0.8, 5.0)
+
+CATALYST = {"name": "NiO@SiO2", "Weak": 59.3, "Medium": 9.43, "High": 31.3,
+            "Fresh": 0.80, "Reduced": 0.19}
+COLORS = [(0.8, 0.9, 1.0), (0.3, 0.6, 0.9), (0.1, 0.3, 0.8)]
+SPOT = (0.7, 0.0, 0.0)
+
+
+def _rng():
+    return np.random.default_rng(0)
+
+
+# ─── Cases ────────────────────────────────────────────────────────────────────
+# Each case is (name, setup): setup() does the untimed preparation and returns
+# the zero-argument call to time, so large inputs only exist while their case runs.
+
+def _gradient(size, sigma, compact):
+    from catmap.gradient import create_gradient_distribution
+    return lambda: create_gradient_distribution(CATALYST, COLORS, size=size, smoothness=sigma,
+                                                compact=compact)
+
+
+def _gradient_batch(n, size):
+    from catmap.gradient import create_gradient_batch
+    percentages = np.tile([CATALYST[k] for k in ("Weak", "Medium", "High")], (n, 1))
+    return lambda: create_gradient_batch(percentages, COLORS, size=size, compact=True)
+
+
+def _overlay(overlay, size, val, placement="random"):
+    from catmap.gradient import create_gradient_distribution
+    base = create_gradient_distribution(CATALYST, COLORS, size=size, seed=0)
+    return lambda: overlay(base, val, SPOT, rng=_rng(), placement=placement)
+
+
+def _target_coverage(size, target):
+    from catmap.gradient import create_gradient_distribution
+    from catmap.particles import overlay_circular_particles
+    base = create_gradient_distribution(CATALYST, COLORS, size=size, seed=0)
+    return lambda: overlay_circular_particles(base, None, SPOT, rng=_rng(),
+                                              target_coverage=target, return_coverage=True)
+
+
+def _animation(size, frames):
+    from catmap.animate import dispersion_frames
+    from catmap.gradient import create_gradient_distribution
+    base = create_gradient_distribution(CATALYST, COLORS, size=size, seed=0, compact=True)
+
+    def call():
+        for _ in dispersion_frames(base, CATALYST["Fresh"], CATALYST["Reduced"], SPOT,
+                                   frames=frames, rng=_rng()):
+            pass
+    return call
+
+
+def _dispersion(size, compact):
+    from catmap.dispersion import create_dispersion_distribution
+    from catmap.palettes import FRESH_COLOR, REDUCED_COLOR
+    return lambda: create_dispersion_distribution(CATALYST["Fresh"], CATALYST["Reduced"],
+                                                  FRESH_COLOR, REDUCED_COLOR, size=size,
+                                                  rng=_rng(), compact=compact)
+
+
+def _grid(size):
+    from catmap.grid import create_distribution_grid
+    return lambda: create_distribution_grid(CATALYST, COLORS[1], grid_size=size, rng=_rng())
+
+
+def _sphere(n_u, n_v):
+    from catmap.sphere import build_textured_sphere
+    return lambda: build_textured_sphere(CATALYST, COLORS, n_u=n_u, n_v=n_v, rng=_rng())
+
+
+def _cylinder(n_u, n_v):
+    from catmap.cylinder import build_cylinder
+    from catmap.gradient import gradient_intensity
+    intensity = gradient_intensity(CATALYST, size=(n_v, n_u), smoothness=8, seed=0)
+    return lambda: build_cylinder(intensity, bump_scale=0.5)
+
+
+def _figure(kind):
+    from catmap.render import render_figure
+
+    def call():
+        fig = render_figure(kind, CATALYST, seed=0)
+        fig.savefig(io.BytesIO(), format="png", dpi=100, bbox_inches='tight')
+    return call
+
+
+def _raster(kind):
+    from catmap.render import save_raster
+    path = os.path.join(tempfile.gettempdir(), "catmap-bench.png")
+    return lambda: save_raster(kind, CATALYST, path, seed=0)
+
+
+def generator_cases(sizes, sigmas, dispersions):
+    from catmap.particles import overlay_circular_particles, overlay_smooth_circles
+
+    for size in sizes:
+        for sigma in sigmas:
+            yield f"gradient/size={size}/sigma={sigma}", partial(_gradient, size, sigma, False)
+            yield (f"gradient/size={size}/sigma={sigma}/compact",
+                   partial(_gradient, size, sigma, True))
+    for n, size in ((256, 64), (64, 200)):
+        yield f"gradient_batch/n={n}/size={size}/compact", partial(_gradient_batch, n, size)
+    for size in sizes:
+        for val in dispersions:
+            yield (f"particles/size={size}/dispersion={val}",
+                   partial(_overlay, overlay_circular_particles, size, val))
+            yield (f"smooth_circles/size={size}/dispersion={val}",
+                   partial(_overlay, overlay_smooth_circles, size, val))
+            yield (f"particles/size={size}/dispersion={val}/poisson",
+                   partial(_overlay, overlay_circular_particles, size, val, "poisson"))
+    for size in sizes:
+        yield f"particles/size={size}/target=25", partial(_target_coverage, size, 25.0)
+    for size in sizes:
+        yield f"animation/size={size}/frames=60", partial(_animation, size, 60)
+    for size in sizes:
+        yield f"dispersion/size={size}", partial(_dispersion, size, False)
+        yield f"dispersion/size={size}/compact", partial(_dispersion, size, True)
+        yield f"grid/size={size}", partial(_grid, size)
+
+
+def mesh_cases():
+    for n_u, n_v in ((100, 50), (1000, 500)):
+        yield f"sphere/mesh={n_u}x{n_v}", partial(_sphere, n_u, n_v)
+    for n_u, n_v in ((300, 100), (3000, 1000)):
+        yield f"cylinder/mesh={n_u}x{n_v}", partial(_cylinder, n_u, n_v)
+
+
+def export_cases():
+    from catmap.render import KINDS
+
+    for kind in KINDS:
+        yield f"figure/{kind}", partial(_figure, kind)
+    for kind in KINDS:
+        yield f"raster/{kind}", partial(_raster, kind)
+
+
+def all_cases(sizes, sigmas, dispersions):
+    yield from generator_cases(sizes, sigmas, dispersions)
+    yield from mesh_cases()
+    yield from export_cases()
+
+
+# ─── Measurement ──────────────────────────────────────────────────────────────
+
+def measure(fn, repeat):
+    """Median and best wall time in seconds over repeat calls, and the traced peak in bytes."""
+    fn()  # warm-up: imports, footprints, palettes
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"time": statistics.median(times), "best": min(times), "peak": peak}
+
+
+def run(cases, repeat, pattern=None, report=print):
+    results = {}
+    for name, setup in cases:
+        if pattern and not any(p in name for p in pattern):
+            continue
+        fn = setup()
+        results[name] = measure(fn, repeat)
+        del fn
+        report(name, results[name])
+    return results
+
+
+def environment():
+    import matplotlib
+    from catmap.blur import numpy_gaussian_filter, resolve_gaussian_filter
+
+    # the blur falls back to NumPy without SciPy, which changes the timings
+    blur = "numpy" if resolve_gaussian_filter() is numpy_gaussian_filter else "scipy"
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__, "blur": blur,
+            "machine": platform.machine(), "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+# ─── Report ───────────────────────────────────────────────────────────────────
+
+def _ms(seconds):
+    return f"{seconds * 1e3:10.1f}"
+
+
+def _mb(nbytes):
+    return f"{nbytes / 2**20:9.1f}"
+
+
+def row(name, result, baseline=None, tolerance=0.1):
+    line = f"{name:<44}{_ms(result['time'])}{_ms(result['best'])}{_mb(result['peak'])}"
+    if baseline is None:
+        return line
+    ratio = result["time"] / baseline["time"]
+    mark = "slower" if ratio > 1 + tolerance else "faster" if ratio < 1 - tolerance else ""
+    return (line + f"{_ms(baseline['time'])}{ratio:8.2f}x"
+            f"{result['peak'] / max(baseline['peak'], 1):8.2f}x  {mark}")
+
+
+def header(compare):
+    line = f"{'case':<44}{'median ms':>10}{'best ms':>10}{'peak MB':>9}"
+    return line + f"{'base ms':>10}{'time':>9}{'memory':>9}" if compare else line
+
+
+def regressions(results, baseline, tolerance):
+    return [name for name, r in results.items()
+            if name in baseline and r["time"] > baseline[name]["time"] * (1 + tolerance)]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python benchmarks/bench.py",
+        description="Time the catmap generators, mesh builders and figure export.")
+    parser.add_argument("-k", dest="pattern", nargs="+",
+                        help="only run cases whose name contains one of these strings")
+    parser.add_argument("--sizes", type=int, nargs="+", help=f"map sizes (default: {SIZES})")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"use the sizes {QUICK_SIZES} and a single repeat")
+    parser.add_argument("--sigmas", type=float, nargs="+", default=SIGMAS)
+    parser.add_argument("--dispersions", type=float, nargs="+", default=DISPERSIONS)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="JSON", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative time change reported as slower/faster (default: 0.10)")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 if a case is slower than the baseline "
+                             "by more than the tolerance")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    repeat = 1 if args.quick else args.repeat
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+
+    print(header(bool(baseline)))
+    results = run(all_cases(sizes, args.sigmas, args.dispersions), repeat, args.pattern,
+                  report=lambda name, r: print(row(name, r, baseline.get(name), args.tolerance),
+                                               flush=True))
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump({"environment": environment(), "repeat": repeat, "results": results},
+                      fh, indent=1)
+    slower = regressions(results, baseline, args.tolerance)
+    if baseline:
+        print(f"\n{len(slower)} of {len(results)} cases slower than the baseline"
+              f" by more than {args.tolerance:.0%}" + (": " + ", ".join(slower) if slower else ""))
+    return 1 if args.check and slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Catalyst mapping library: gradient elemental maps, particle dispersion
+overlays, categorical distribution grids and textured 3D meshes.
+
+Importing the package is side-effect free and cheap: submodules (and with
+them NumPy, SciPy and Matplotlib) are only loaded when one of the names
+below is first used.
+"""
+import importlib
+
+_EXPORTS = {
+    # palettes
+    "LEVELS": "palettes",
+    "GRADIENT_PALETTES": "palettes",
+    "CYLINDER_PALETTES": "palettes",
+    "SPOT_COLORS": "palettes",
+    "FRESH_COLOR": "palettes",
+    "REDUCED_COLOR": "palettes",
+    # blur
+    "gaussian_filter": "blur",
+    "resolve_gaussian_filter": "blur",
+    # gradient maps
+    "label_field": "gradient",
+    "gradient_intensity": "gradient",
+    "palette_cmap": "gradient",
+    "palette_lut": "gradient",
+    "apply_lut": "gradient",
+    "colorize": "gradient",
+    "create_gradient_distribution": "gradient",
+    "create_gradient_batch": "gradient",
+    "measure_percentages": "gradient",
+    "cut_at_quantiles": "gradient",
+    "clear_caches": "gradient",
+    "create_gradient_tiled": "tiled",
+    # particle overlays
+    "overlay_circular_particles": "particles",
+    "overlay_smooth_circles": "particles",
+    "composite_circles": "particles",
+    "poisson_disk_centers": "poisson",
+    # dispersion animations
+    "ParticleFrames": "animate",
+    "dispersion_frames": "animate",
+    "write_animation": "animate",
+    "save_animation": "animate",
+    # dispersion maps
+    "create_dispersion_distribution": "dispersion",
+    # categorical grids
+    "get_shade_color": "grid",
+    "create_distribution_grid": "grid",
+    # meshes
+    "build_textured_sphere": "sphere",
+    "build_cylinder": "cylinder",
+    "unit_sphere": "mesh",
+    "unit_cylinder": "mesh",
+    "mesh_buffers": "mesh",
+    "render_surface": "raster3d",
+    "mesh_counts": "lod",
+    "resample_texture": "lod",
+    # catalyst tables and figures
+    "parse_catalyst_table": "table",
+    "read_catalyst_table": "table",
+    "render_figure": "render",
+    "save_figure": "render",
+    "figure_png": "render",
+    "figure_rgba": "render",
+    "RenderJob": "render",
+    "render_jobs": "render",
+    "save_raster": "render",
+    # direct raster export
+    "export_map": "export",
+    "encode_png": "export",
+    "write_png": "export",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,144 @@
+"""
+Fresh → Reduced dispersion animations.
+
+The gradient base stays fixed while Ni particles come and go: every frame
+shows the first k of one fixed random sequence of disk centers, with k
+interpolated from the Fresh to the Reduced dispersion over the frames.
+ParticleFrames keeps a per-pixel count of the disks covering it, so going
+from one frame to the next only touches the pixels of the disks added or
+removed: a pixel takes the spot color when its count leaves 0 and gets the
+base back when the count returns to 0. Nothing else is recomposited, and a
+frame is what overlay_circular_particles draws for the same centers.
+
+write_animation streams frames to disk as they are made, one PNG per frame
+or a single (frames, H, W, 4) .npy stack written through a memmap, so
+memory stays at a frame or two whatever the frame count.
+
+    save_animation(catalyst, "frames/{:04d}.png", frames=300, size=(1080, 1920))
+"""
+import os
+
+import numpy as np
+
+from . import instrument
+from .export import to_uint8, write_png
+from .particles import disk_pixels
+
+
+class ParticleFrames:
+    """
+    Up to max_spots disks of radius r over base, an RGBA map (kept as
+    uint8), shown a prefix of one random center sequence at a time.
+    """
+
+    def __init__(self, base, max_spots, spot_color, r=1, rng=None):
+        rng = np.random.default_rng() if rng is None else rng
+        self.base = to_uint8(base)
+        H, W, _ = self.base.shape
+        self.shape = (H, W)
+        self.r = r
+        self.centers = rng.choice(H * W, size=min(max_spots, H * W), replace=False)
+        self.color = to_uint8(np.reshape(spot_color, (1, 1, -1)))[0, 0]
+        self.frame = self.base.copy()
+        self.count = np.zeros(H * W, dtype=np.int32)  # disks covering each pixel
+        self.spots = 0
+        self.covered = 0  # pixels with a nonzero count
+
+    @property
+    def coverage(self):
+        """Percent of the map the current frame's disks cover, kept up to date by set_spots."""
+        return self.covered / self.count.size * 100
+
+    @property
+    def image(self):
+        """Read-only view of the current frame; it changes with set_spots."""
+        view = self.frame.view()
+        view.setflags(write=False)
+        return view
+
+    def set_spots(self, k):
+        """Show the first k centers; returns the flat indices of the pixels that changed."""
+        k = min(max(int(k), 0), len(self.centers))
+        adding = k > self.spots
+        lo, hi = sorted((self.spots, k))
+        self.spots = k
+        if lo == hi:
+            return np.empty(0, dtype=np.intp)
+        pix, hits = np.unique(disk_pixels(self.centers[lo:hi], self.shape, self.r),
+                              return_counts=True)
+        before = self.count[pix]
+        after = before + hits if adding else before - hits
+        self.count[pix] = after
+        changed = pix[(before == 0) != (after == 0)]
+        flat = self.frame.reshape(-1, 4)
+        flat[changed] = self.color if adding else self.base.reshape(-1, 4)[changed]
+        self.covered += changed.size if adding else -changed.size
+        return changed
+
+
+def spot_counts(shape, fresh, reduced, frames):
+    """Disk count of each frame: H*W*val/100 with val going linearly from fresh to reduced."""
+    H, W = shape
+    return (H * W * (np.linspace(fresh, reduced, frames) / 100.0)).astype(np.int64)
+
+
+def dispersion_frames(base, fresh, reduced, spot_color, frames=120, r=1, rng=None):
+    """
+    Yield frames uint8 RGBA frames of base with particles going from the
+    fresh to the reduced dispersion (as in overlay_circular_particles).
+    Every frame is the same buffer updated in place; copy one to keep it.
+    """
+    counts = spot_counts(base.shape[:2], fresh, reduced, frames)
+    anim = ParticleFrames(base, int(counts.max(initial=0)), spot_color, r, rng)
+    for k in counts:
+        with instrument.stage("frame"):
+            anim.set_spots(k)
+        yield anim.image
+
+
+def write_animation(frames, path, n_frames=None, compress_level=1):
+    """
+    Write frames to disk as they come and return the paths written. A path
+    ending in .npy gets one (n_frames, H, W, 4) uint8 stack; any other path
+    is a pattern formatted with the frame number, e.g. "out/{:04d}.png",
+    and each frame becomes a PNG.
+    """
+    if os.path.splitext(path)[1].lower() != ".npy":
+        written = []
+        for i, frame in enumerate(frames):
+            written.append(path.format(i))
+            with instrument.stage("encode"):
+                write_png(written[-1], frame, compress_level)
+        return written
+
+    if n_frames is None:
+        raise ValueError("writing a .npy stack needs n_frames")
+    out = None
+    for i, frame in enumerate(frames):
+        if out is None:
+            out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8,
+                                            shape=(n_frames,) + frame.shape)
+        with instrument.stage("encode"):
+            out[i] = frame
+    if out is not None:
+        out.flush()
+    return [path]
+
+
+def save_animation(catalyst, path, frames=120, index=0, seed=None, size=200, smoothness=2,
+                   r=1, mode="labels", compress_level=1):
+    """
+    Animate a catalyst's Ni dispersion from Fresh to Reduced over its
+    gradient map (the combined kind's panels, in between) and write it with
+    write_animation. size is an int or (H, W) in pixels.
+    """
+    from .gradient import create_gradient_distribution
+    from .palettes import GRADIENT_PALETTES, SPOT_COLORS
+
+    base = create_gradient_distribution(catalyst, GRADIENT_PALETTES[index % len(GRADIENT_PALETTES)],
+                                        size=size, smoothness=smoothness, seed=seed,
+                                        compact=True, mode=mode)
+    stream = dispersion_frames(base, catalyst["Fresh"], catalyst["Reduced"],
+                               SPOT_COLORS[index % len(SPOT_COLORS)], frames, r,
+                               np.random.default_rng(seed))
+    return write_animation(stream, path, frames, compress_level)
@@ -0,0 +1,109 @@
+"""
+Headless batch renderer.
+
+    python -m catmap catalysts.csv --kind heatmap sphere --out renders/
+
+Reads a catalyst table (see catmap.table) and writes one file per catalyst
+and figure kind, using the Agg backend; no window is ever opened.
+"""
+import argparse
+import os
+import re
+import sys
+
+
+def output_path(out_dir, index, name, kind, fmt):
+    """Unique, filesystem-safe file name for one catalyst figure."""
+    slug = re.sub(r"[^\w@.-]+", "_", name).strip("_") or "catalyst"
+    return os.path.join(out_dir, f"{index + 1:04d}_{slug}_{kind}.{fmt}")
+
+
+def build_parser():
+    from .render import KINDS
+
+    parser = argparse.ArgumentParser(
+        prog="python -m catmap",
+        description="Render catalyst maps from a Weak,Medium,High,Fresh,Reduced table.")
+    parser.add_argument("table", help="catalyst CSV table, or - to read stdin")
+    parser.add_argument("-k", "--kind", nargs="+", choices=KINDS + ("all",), default=["heatmap"],
+                        help="figure kinds to render (default: heatmap)")
+    parser.add_argument("-o", "--out", default="renders", help="output directory")
+    parser.add_argument("-f", "--format", default="png",
+                        help="image format (default: png; --raster writes png or npy)")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--raster", action="store_true",
+                        help="write maps straight to PNG/NPY pixels instead of through a "
+                             "matplotlib figure; sphere and cylinder use a z-buffer renderer")
+    parser.add_argument("--compact", action="store_true",
+                        help="build maps as float32 intensity and uint8 RGBA (always on with --raster)")
+    parser.add_argument("--mode", choices=("labels", "quantile"), default="labels",
+                        help="gradient synthesis: blurred exact labels, or blurred noise cut "
+                             "at the exact level quantiles (default: labels)")
+    parser.add_argument("--size", type=int, nargs="+", metavar="PX",
+                        help="raster map size in pixels: SIZE or HEIGHT WIDTH; the title "
+                             "and legend strips are added around it")
+    parser.add_argument("--no-title", dest="title", action="store_false",
+                        help="leave the catalyst name strip off raster images")
+    parser.add_argument("--no-legend", dest="legend", action="store_false",
+                        help="leave the legend strip off raster images")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="base random seed; catalyst i uses seed + i")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="render in this many worker processes; 0 uses every CPU (default: 1)")
+    parser.add_argument("--profile", metavar="JSONL",
+                        help="append per-stage timing records (see catmap.instrument) to this file")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="add tracemalloc peak memory to the --profile records (slower)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not list written files")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use("Agg")
+    from . import instrument
+    from .render import KINDS, RenderJob, render_jobs
+    from .table import read_catalyst_table
+
+    try:
+        catalysts = read_catalyst_table(args.table)
+    except OSError as exc:
+        parser.error(f"cannot read {args.table}: {exc.strerror}")
+    if not catalysts:
+        parser.error(f"no catalysts found in {args.table}")
+    if args.workers < 0:
+        parser.error("--workers must be 0 or more")
+    if args.profile_memory and not args.profile:
+        parser.error("--profile-memory needs --profile")
+    kinds = KINDS if "all" in args.kind else tuple(dict.fromkeys(args.kind))
+    if args.raster and args.format not in ("png", "npy"):
+        parser.error("--raster writes png or npy files")
+    if args.size is not None and (len(args.size) > 2 or min(args.size) < 1):
+        parser.error("--size takes one or two positive pixel counts")
+    size = args.size and (args.size[0] if len(args.size) == 1 else tuple(args.size))
+    os.makedirs(args.out, exist_ok=True)
+
+    jobs = [
+        RenderJob(kind, catalyst, index,
+                  None if args.seed is None else args.seed + index,
+                  output_path(args.out, index, catalyst["name"], kind, args.format),
+                  args.dpi, args.raster, size, args.compact, args.mode, args.title, args.legend)
+        for index, catalyst in enumerate(catalysts)
+        for kind in kinds
+    ]
+    if args.profile:
+        instrument.enable(path=args.profile, memory=args.profile_memory)
+    try:
+        for path in render_jobs(jobs, workers=args.workers):
+            if not args.quiet:
+                print(path)
+    finally:
+        instrument.disable()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Direct raster output for the 2D maps.
+
+Gradient, dispersion and particle maps are plain RGBA arrays, so they can be
+written straight to PNG (or a raw .npy array) at an exact pixel size without
+going through imshow, savefig and matplotlib's resampler. The PNG encoder
+only needs zlib; minimal title and legend strips are composited in NumPy.
+"""
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from . import instrument
+
+
+def to_uint8(img):
+    """RGBA uint8 copy of a float [0, 1] or uint8 RGB/RGBA image."""
+    img = np.asarray(img)
+    if img.dtype != np.uint8:
+        img = np.rint(np.clip(img, 0, 1) * 255).astype(np.uint8)
+    if img.shape[2] == 3:
+        img = np.concatenate([img, np.full(img.shape[:2] + (1,), 255, np.uint8)], axis=2)
+    return img
+
+
+def resize(img, size, resample='nearest'):
+    """
+    Resample img to size = (H, W) pixels. 'nearest' keeps crisp particle
+    edges; 'bilinear' suits the smooth gradient maps.
+    """
+    H, W = size
+    h, w = img.shape[:2]
+    if (h, w) == (H, W):
+        return img
+    if resample == 'nearest':
+        rows = (np.arange(H) * h // H)
+        cols = (np.arange(W) * w // W)
+        return img[rows[:, None], cols[None, :]]
+    if resample != 'bilinear':
+        raise ValueError(f"unknown resample mode {resample!r}")
+
+    # pixel-center aligned sample positions
+    y = np.clip((np.arange(H) + 0.5) * h / H - 0.5, 0, h - 1)
+    x = np.clip((np.arange(W) + 0.5) * w / W - 0.5, 0, w - 1)
+    y0 = np.floor(y).astype(np.intp)
+    x0 = np.floor(x).astype(np.intp)
+    y1 = np.minimum(y0 + 1, h - 1)
+    x1 = np.minimum(x0 + 1, w - 1)
+    fy = (y - y0)[:, None, None]
+    fx = (x - x0)[None, :, None]
+    src = img.astype(np.float32)
+    top = src[y0][:, x0] * (1 - fx) + src[y0][:, x1] * fx
+    bottom = src[y1][:, x0] * (1 - fx) + src[y1][:, x1] * fx
+    out = top * (1 - fy) + bottom * fy
+    return np.rint(out).astype(img.dtype) if img.dtype == np.uint8 else out.astype(img.dtype)
+
+
+def _chunk(tag, data):
+    return (struct.pack(">I", len(data)) + tag + data +
+            struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff))
+
+
+def encode_png(img, compress_level=6):
+    """PNG bytes of an RGBA image, every row with the Up filter."""
+    img = to_uint8(img)
+    H, W, _ = img.shape
+    rows = img.reshape(H, W * 4)
+    filtered = np.empty((H, W * 4 + 1), np.uint8)
+    filtered[:, 0] = 2  # Up: difference to the row above, wrapping mod 256
+    filtered[0, 1:] = rows[0]
+    filtered[1:, 1:] = rows[1:] - rows[:-1]
+    header = struct.pack(">IIBBBBB", W, H, 8, 6, 0, 0, 0)  # 8-bit RGBA
+    return (b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", header) +
+            _chunk(b"IDAT", zlib.compress(filtered.tobytes(), compress_level)) +
+            _chunk(b"IEND", b""))
+
+
+def write_png(path, img, compress_level=6):
+    with open(path, "wb") as fh:
+        fh.write(encode_png(img, compress_level))
+
+
+def text_strip(text, width, height=None, fontsize=14, dpi=100,
+               color=(0, 0, 0), background=(255, 255, 255)):
+    """
+    RGBA uint8 strip, width pixels wide, with text centred on it. Glyphs
+    come from FreeType through matplotlib.ft2font; no figure is built.
+    """
+    from matplotlib import ft2font
+    from matplotlib.font_manager import FontProperties, findfont
+
+    font = ft2font.FT2Font(findfont(FontProperties()))
+    font.set_size(fontsize, dpi)
+    font.set_text(text, 0.0)
+    font.draw_glyphs_to_bitmap(antialiased=True)
+    glyphs = np.asarray(font.get_image())[:, :width]
+    gh, gw = glyphs.shape
+    descent = int(np.ceil(font.get_descent() / 64))  # 26.6 fixed point
+    em = fontsize * dpi / 72
+    height = height or int(round(em * 1.5)) + 8
+    # place the baseline, not the ink box, so strips line up side by side
+    top = min(max(0, height // 2 + int(round(em * 0.35)) - (gh - descent)), max(0, height - gh))
+    left = max(0, (width - gw) // 2)
+    alpha = np.zeros((height, width), np.float32)
+    alpha[top:top + gh, left:left + gw] = glyphs[:height - top] / 255.0
+
+    fg = np.asarray(color, np.float32)
+    bg = np.asarray(background, np.float32)
+    strip = np.full((height, width, 4), 255, np.uint8)
+    strip[:, :, :3] = np.rint(bg + (fg - bg) * alpha[:, :, None]).astype(np.uint8)
+    return strip
+
+
+def legend_strip(colors, width, height=24, labels=None, fontsize=10, dpi=100):
+    """
+    RGBA uint8 strip of equal swatches, one per color; labels, if given,
+    are written under the swatches.
+    """
+    colors = to_uint8(np.asarray(colors, dtype=float).reshape(1, -1, len(colors[0])))[0]
+    edges = np.linspace(0, width, len(colors) + 1).astype(np.intp)
+    which = np.searchsorted(edges, np.arange(width), side='right') - 1
+    strip = np.broadcast_to(colors[which], (height, width, 4)).copy()
+    if labels:
+        row = [text_strip(label, int(edges[i + 1] - edges[i]), fontsize=fontsize, dpi=dpi)
+               for i, label in enumerate(labels)]
+        strip = np.concatenate([strip, np.concatenate(row, axis=1)], axis=0)
+    return strip
+
+
+def export_map(img, path, size=None, resample='nearest', title=None, legend=None,
+               legend_labels=None):
+    """
+    Write a map array to path: PNG for '.png', a raw array for '.npy'.
+    size = (H, W) or an int resamples the map itself to exactly that many
+    pixels; the optional title and legend strips are added above and below.
+    """
+    img = to_uint8(img)
+    if size is not None:
+        img = resize(img, (size, size) if np.isscalar(size) else tuple(size), resample)
+    parts = []
+    if title:
+        parts.append(text_strip(title, img.shape[1]))
+    parts.append(img)
+    if legend is not None:
+        parts.append(legend_strip(legend, img.shape[1], labels=legend_labels))
+    out = np.concatenate(parts, axis=0) if len(parts) > 1 else img
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".npy", ".png"):
+        raise ValueError(f"raster export writes .png or .npy, not {ext!r}")
+    with instrument.stage("encode"):
+        if ext == ".npy":
+            np.save(path, out)
+        else:
+            write_png(path, out)
+    return out
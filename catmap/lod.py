@@ -0,0 +1,77 @@
+"""
+Level of detail for the 3D meshes.
+
+A mesh needs no more vertices than the pixels it covers can show. The
+helpers here pick (n_u, n_v) from the size a surface will have in the
+saved image, capped at the full resolution a script asks for, so small
+subplots in a large grid build and draw far fewer quads while print
+figures keep full detail. Pass the chosen counts on as rcount/ccount so
+plot_surface draws every quad of the mesh and no other.
+
+Textures computed at full resolution are brought to the chosen mesh size
+with resample_texture, which keeps their look (the blur scale of the
+cylinder maps, for instance) independent of the level of detail.
+"""
+import math
+
+import numpy as np
+
+# on-screen width of the quads in the middle of a wrapped surface; finer
+# meshes only add polygons
+PIXELS_PER_QUAD = 4
+
+# share of an mplot3d axes' shorter side a fitted surface spans; the 3D
+# box leaves margins around it
+SURFACE_FILL = 0.6
+
+
+def axes_pixels(ax, dpi=None):
+    """Width and height of ax in output pixels at dpi (default: the figure's)."""
+    fig = ax.get_figure()
+    width, height = fig.get_size_inches()
+    box = ax.get_position()
+    dpi = dpi or fig.dpi
+    return box.width * width * dpi, box.height * height * dpi
+
+
+def surface_pixels(ax, dpi=None, fill=SURFACE_FILL):
+    """Approximate on-screen size in pixels of a surface fitted to ax."""
+    return min(axes_pixels(ax, dpi)) * fill
+
+
+def mesh_counts(extent_px, full, minimum=(12, 6), pixels_per_quad=PIXELS_PER_QUAD):
+    """
+    (n_u, n_v) for a wrapped mesh of at most full = (n_u, n_v) vertices
+    that spans extent_px pixels on screen. n_u runs around the surface, so
+    the quads facing the viewer are pi * extent_px / n_u pixels wide; n_v
+    keeps its ratio to n_u.
+    """
+    n_u, n_v = full
+    needed = math.pi * extent_px / pixels_per_quad
+    scale = min(1.0, needed / n_u)
+    return (min(n_u, max(minimum[0], math.ceil(n_u * scale))),
+            min(n_v, max(minimum[1], math.ceil(n_v * scale))))
+
+
+def resample_texture(texture, shape):
+    """
+    Bilinearly resample a per-vertex texture (H, W) or (H, W, C) to shape,
+    keeping its first and last rows and columns on the mesh edges.
+    """
+    texture = np.asarray(texture)
+    h, w = texture.shape[:2]
+    H, W = shape
+    if (h, w) == (H, W):
+        return texture
+    y = np.linspace(0, h - 1, H)
+    x = np.linspace(0, w - 1, W)
+    y0 = np.minimum(y.astype(np.intp), h - 2) if h > 1 else np.zeros(H, np.intp)
+    x0 = np.minimum(x.astype(np.intp), w - 2) if w > 1 else np.zeros(W, np.intp)
+    y1 = np.minimum(y0 + 1, h - 1)
+    x1 = np.minimum(x0 + 1, w - 1)
+    extra = (None,) * (texture.ndim - 2)
+    fy = (y - y0)[(slice(None), None) + extra]
+    fx = (x - x0)[(None, slice(None)) + extra]
+    top = texture[y0][:, x0] * (1 - fx) + texture[y0][:, x1] * fx
+    bottom = texture[y1][:, x0] * (1 - fx) + texture[y1][:, x1] * fx
+    return (top * (1 - fy) + bottom * fy).astype(np.result_type(texture.dtype, np.float32))
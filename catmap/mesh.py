@@ -0,0 +1,70 @@
+"""
+Cached unit meshes for the 3D figures.
+
+Every catalyst sphere, legend sphere and cylinder of a given resolution
+shares the same parameter grid and trig tables; only its radial
+displacement differs. unit_sphere and unit_cylinder build those tables once
+per resolution and hand out the same read-only arrays on every later call,
+and the mesh builders write each catalyst's displaced x, y, z into buffers
+from mesh_buffers, which a loop over catalysts can reuse.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+def _frozen(*arrays):
+    for a in arrays:
+        a.setflags(write=False)
+    return arrays
+
+
+@lru_cache(maxsize=8)
+def unit_sphere(n_u, n_v):
+    """
+    Read-only (u, v, x, y, z) of the unit sphere: u (n_u,) around the
+    equator, v (n_v,) from pole to pole and x, y, z of shape (n_u, n_v).
+    """
+    u = np.linspace(0, 2 * np.pi, n_u)
+    v = np.linspace(0, np.pi, n_v)
+    x = np.outer(np.cos(u), np.sin(v))
+    y = np.outer(np.sin(u), np.sin(v))
+    z = np.outer(np.ones(n_u), np.cos(v))
+    return _frozen(u, v, x, y, z)
+
+
+@lru_cache(maxsize=8)
+def unit_cylinder(n_u, n_v, height=4.0, dtype=np.dtype(float)):
+    """
+    Read-only (cos_u, sin_u, v) of a cylinder with n_u vertices around and
+    n_v along its height: cos_u, sin_u of shape (n_u,) and the heights v of
+    shape (n_v,), all in dtype.
+    """
+    u = np.linspace(0, 2 * np.pi, n_u, dtype=dtype)
+    v = np.linspace(-height / 2, height / 2, n_v, dtype=dtype)
+    return _frozen(np.cos(u), np.sin(u), v)
+
+
+def mesh_buffers(shape, dtype=float, pool=None):
+    """
+    Three empty (x, y, z) arrays of shape for the out= argument of the mesh
+    builders. With a dict as pool the buffers are kept per (shape, dtype)
+    and handed out again by later calls, so a loop over catalysts allocates
+    them once. plot_surface and render_surface copy what they draw, so a
+    buffer can be refilled as soon as its mesh has been drawn.
+    """
+    key = (tuple(shape), np.dtype(dtype))
+    if pool is not None and key in pool:
+        return pool[key]
+    buffers = tuple(np.empty(shape, dtype) for _ in range(3))
+    if pool is not None:
+        pool[key] = buffers
+    return buffers
+
+
+def clear_mesh_cache():
+    """Drop the cached unit meshes and sphere textures."""
+    from .sphere import _sphere_relief
+
+    for stage in (unit_sphere, unit_cylinder, _sphere_relief):
+        stage.cache_clear()
@@ -0,0 +1,123 @@
+"""
+Textured catalyst spheres: vertices are assigned Weak/Medium/High
+intensities in proportion to the catalyst's percentages, colored from its
+palette and displaced by a texture pattern per intensity.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from . import instrument
+from .mesh import mesh_buffers, unit_sphere
+from .palettes import LEVELS
+
+
+def create_texture_points(intensity, n_points=100):
+    """Texture (size, spacing) for the Weak, Medium or High intensity."""
+    if intensity == "Weak":
+        # Sparse, small dots pattern
+        size = 5
+        spacing = 0.15
+    elif intensity == "Medium":
+        # Medium density striped pattern
+        size = 10
+        spacing = 0.10
+    else:  # High
+        # Dense, larger bumps pattern
+        size = 15
+        spacing = 0.05
+
+    return size, spacing
+
+
+def assign_intensity_labels(percentages, shape, rng=None):
+    """
+    Return an int8 array of intensity codes (0=Weak, 1=Medium, 2=High) with
+    the given shape, filled in proportion to percentages and shuffled.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n_points = int(np.prod(shape))
+    labels = np.zeros(n_points, dtype=np.int8)  # leftover points default to Weak
+    start = 0
+    levels = [(intensity, percentages.get(intensity, 0)) for intensity in LEVELS]
+    for intensity, percentage in sorted(levels, key=lambda x: x[1], reverse=True):
+        if percentage > 0:
+            n = int(percentage / 100.0 * n_points)
+            labels[start:start + n] = LEVELS.index(intensity)
+            start += n
+    rng.shuffle(labels)
+    return labels.reshape(shape)
+
+
+def _relief(u, v):
+    """Medium and High displacement patterns over the (u, v) grid."""
+    U, V = u[:, None], v[None, :]
+    _, sp_m = create_texture_points("Medium")
+    _, sp_h = create_texture_points("High")
+
+    # Medium: medium bumps - sinusoidal pattern
+    medium = 0.05 * np.sin(U / sp_m) * np.cos(V / sp_m)
+    # High: pronounced bumps - combined sinusoidal pattern
+    high = 0.08 * (np.sin(U / sp_h) * np.cos(V / sp_h) +
+                   np.sin(2 * U / sp_h) * np.cos(2 * V / sp_h))
+    return medium, high
+
+
+@lru_cache(maxsize=8)
+def _sphere_relief(n_u, n_v):
+    """_relief on the unit_sphere grid, computed once per resolution, read-only."""
+    u, v = unit_sphere(n_u, n_v)[:2]
+    patterns = _relief(u, v)
+    for p in patterns:
+        p.setflags(write=False)
+    return patterns
+
+
+def _factor(labels, relief, rng, out=None):
+    # Weak: smooth texture - small random perturbation
+    weak = rng.random(labels.shape, out=out)
+    weak *= 0.02
+    np.choose(labels, (weak,) + tuple(relief), out=weak)
+    weak += 1.0
+    return weak
+
+
+def texture_factor(labels, u, v, rng=None):
+    """
+    Radial scale factor for every (u, v) vertex, using the perturbation
+    pattern of each vertex's intensity code.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    return _factor(labels, _relief(u, v), rng)
+
+
+def build_textured_sphere(percentages, colors, n_u=100, n_v=50, radius=1.0,
+                          rng=None, return_labels=False, out=None):
+    """
+    Build a sphere whose vertices are assigned Weak/Medium/High intensities in
+    proportion to percentages, colored from the 3-stop palette colors and
+    displaced by the matching texture.
+
+    Returns x, y, z with shape (n_u, n_v) and facecolors with shape
+    (n_u, n_v, 3); with return_labels=True the intensity codes are appended.
+    The unit mesh and its textures come from the per-resolution cache in
+    catmap.mesh; x, y, z are written into out (see mesh_buffers) if given.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    unit = unit_sphere(n_u, n_v)[2:]
+    x, y, z = mesh_buffers((n_u, n_v)) if out is None else out
+
+    labels = assign_intensity_labels(percentages, (n_u, n_v), rng)
+    facecolors = np.asarray(colors, dtype=float)[labels]
+
+    # the radius goes through z until the last product
+    with instrument.stage("mesh"):
+        r = _factor(labels, _sphere_relief(n_u, n_v), rng, out=z)
+        r *= radius
+        np.multiply(r, unit[0], out=x)
+        np.multiply(r, unit[1], out=y)
+        np.multiply(r, unit[2], out=z)
+
+    if return_labels:
+        return x, y, z, facecolors, labels
+    return x, y, z, facecolors
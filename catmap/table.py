@@ -0,0 +1,58 @@
+"""
+Catalyst tables in the demo CSV format.
+
+Each line holds Weak,Medium,High,Fresh,Reduced for one catalyst; trailing
+columns may be left out and default to 0. An optional header line names the
+columns instead (any order, case-insensitive) and may add a Name column.
+Lines that do not parse are skipped, like in the browser demos.
+"""
+import csv
+import io
+import sys
+
+COLUMNS = ("Weak", "Medium", "High", "Fresh", "Reduced")
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_catalyst_table(text):
+    """Parse CSV text into a list of dicts with a name and the five COLUMNS."""
+    lines = [ln for ln in text.splitlines() if ln.strip()]
+    reader = csv.reader(lines)
+    header = None
+    rows = []
+    for fields in reader:
+        fields = [f.strip() for f in fields]
+        if header is None and not rows and fields and not _is_number(fields[0]):
+            header = [f.lower() for f in fields]
+            continue
+        try:
+            if header is None:
+                values = dict(zip(COLUMNS, map(float, fields[:len(COLUMNS)])))
+                name = None
+            else:
+                record = dict(zip(header, fields))
+                values = {c: float(record[c.lower()]) for c in COLUMNS if record.get(c.lower())}
+                name = record.get("name") or None
+        except ValueError:
+            continue
+        if not values:
+            continue
+        row = {"name": name or f"Catalyst {len(rows) + 1}"}
+        row.update({c: values.get(c, 0.0) for c in COLUMNS})
+        rows.append(row)
+    return rows
+
+
+def read_catalyst_table(path):
+    """Read a catalyst table from a file path, or from stdin for '-'."""
+    if path == "-":
+        return parse_catalyst_table(sys.stdin.read())
+    with io.open(path, encoding="utf-8") as fh:
+        return parse_catalyst_table(fh.read())
@@ -0,0 +1,140 @@
+"""
+Tiled gradient maps for sizes that do not fit in memory.
+
+The map is cut into tile x tile blocks. Every block gets its own shuffled
+label field holding the exact Weak/Medium/High counts for its area, drawn
+from a generator keyed by (seed, tile row, tile column), so a block can be
+regenerated whenever a neighbour needs it. Each block is blurred together
+with a halo of neighbouring labels as wide as the Gaussian kernel
+(int(4 * smoothness + 0.5) pixels), which makes the tiled blur identical to
+blurring the whole field at once: there are no seams.
+
+Generation takes two passes over the tiles. The first writes the blurred
+intensity to a float32 memmap and tracks its global min and max; the second
+normalizes, colors and writes uint8 RGBA tiles to the output .npy. Memory
+stays bounded by a few rows of tiles whatever the map size.
+"""
+import os
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+from .blur import gaussian_filter
+from .gradient import apply_lut, palette_lut, percentages_key
+
+
+def _tile_slices(n, tile):
+    return [slice(start, min(start + tile, n)) for start in range(0, n, tile)]
+
+
+def tile_labels(pct, shape, rng):
+    """Shuffled int8 field of 0/1/2 (Weak/Medium/High) with exact counts for shape."""
+    H, W = shape
+    total = H * W
+    n_weak = int(pct[0] / 100 * total)
+    n_medium = int(pct[1] / 100 * total)
+    # rounding leftovers go to High, like gradient.label_field
+    flat = np.full(total, 2, dtype=np.int8)
+    flat[:n_weak] = 0
+    flat[n_weak:n_weak + n_medium] = 1
+    rng.shuffle(flat)
+    return flat.reshape(H, W)
+
+
+def _halo_region(labels, rows, cols, ty, tx, halo, shape):
+    """Labels of tile (ty, tx) plus halo pixels, reflected at the map edges."""
+    H, W = shape
+    r = rows[ty]
+    c = cols[tx]
+    top, bottom = max(0, r.start - halo), min(H, r.stop + halo)
+    left, right = max(0, c.start - halo), min(W, c.stop + halo)
+
+    parts = []
+    for j, rs in enumerate(rows):
+        if rs.stop <= top or rs.start >= bottom:
+            continue
+        band = []
+        for i, cs in enumerate(cols):
+            if cs.stop <= left or cs.start >= right:
+                continue
+            block = labels(j, i)
+            band.append(block[max(top, rs.start) - rs.start:min(bottom, rs.stop) - rs.start,
+                              max(left, cs.start) - cs.start:min(right, cs.stop) - cs.start])
+        parts.append(np.concatenate(band, axis=1))
+    region = np.concatenate(parts, axis=0).astype(np.float32) * 0.5
+
+    # outside the map, mirror it the way the 'reflect' blur mode does
+    pad = ((halo - (r.start - top), halo - (bottom - r.stop)),
+           (halo - (c.start - left), halo - (right - c.stop)))
+    if any(p for pair in pad for p in pair):
+        region = np.pad(region, pad, mode='symmetric')
+    return region
+
+
+def create_gradient_tiled(percentages, colors, path, size, smoothness=2, tile=2048,
+                          seed=None, intensity_path=None):
+    """
+    Write an RGBA uint8 gradient map of size (int or (H, W)) to the .npy file
+    at path, tile by tile, and return it opened as a read-only memmap.
+
+    Every tile honours the Weak/Medium/High percentages exactly. The float32
+    intensity of the first pass goes to a temporary file next to path unless
+    intensity_path names a file to keep it in.
+    """
+    H, W = (size, size) if np.isscalar(size) else tuple(size)
+    pct = percentages_key(percentages)
+    rows, cols = _tile_slices(H, tile), _tile_slices(W, tile)
+    halo = int(4.0 * float(smoothness) + 0.5)
+    entropy = np.random.SeedSequence(seed).entropy
+
+    def rng(ty, tx):
+        return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(ty, tx)))
+
+    # a tile is needed by the tiles around it; keep about three rows of them
+    @lru_cache(maxsize=3 * len(cols) + 3)
+    def labels(ty, tx):
+        return tile_labels(pct, (rows[ty].stop - rows[ty].start,
+                                 cols[tx].stop - cols[tx].start), rng(ty, tx))
+
+    keep = intensity_path is not None
+    if not keep:
+        fd, intensity_path = tempfile.mkstemp(suffix=".f32", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+    try:
+        intensity = np.memmap(intensity_path, dtype=np.float32, mode='w+', shape=(H, W))
+        uniform = 100 in pct
+        lo, hi = np.inf, -np.inf
+
+        # pass 1: blurred intensity and its global range
+        for ty, r in enumerate(rows):
+            for tx, c in enumerate(cols):
+                if uniform:
+                    # single intensity: uniform level with slight texture, as in gradient.py
+                    noise = rng(ty, tx).random((r.stop - r.start, c.stop - c.start), dtype=np.float32)
+                    block = np.clip(pct.index(100) / 2 + noise * 0.05, 0, 1)
+                else:
+                    region = _halo_region(labels, rows, cols, ty, tx, halo, (H, W))
+                    block = gaussian_filter(region, sigma=smoothness)[
+                        halo:halo + r.stop - r.start, halo:halo + c.stop - c.start]
+                    lo, hi = min(lo, block.min()), max(hi, block.max())
+                intensity[r, c] = block
+        labels.cache_clear()
+
+        # pass 2: normalize, color and write RGBA tiles
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(H, W, 4))
+        lut = palette_lut(colors, np.uint8)
+        for r in rows:
+            for c in cols:
+                block = np.asarray(intensity[r, c])
+                if not uniform and hi > lo:  # avoid division by zero
+                    block = (block - lo) / (hi - lo)
+                apply_lut(block, lut, out=out[r, c])
+        out.flush()
+        del out
+        intensity.flush()
+        del intensity
+    finally:
+        if not keep:
+            os.remove(intensity_path)
+    return np.load(path, mmap_mode='r')
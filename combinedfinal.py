@@ -1,42 +1,7 @@
-import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
-import random
-from scipy.ndimage import gaussian_filter
 
-def create_gradient_distribution(percentages, colors, size=200, smoothness=2):
-    H, W = size, size
-    total = H * W
-    if 100 in percentages.values():
-        base_int = list(percentages.values()).index(100) / 2
-        noise = np.random.rand(H, W) * 0.05
-        intensity = np.clip(base_int + noise, 0, 1)
-    else:
-        n_weak = int(percentages['Weak'] / 100 * total)
-        n_medium = int(percentages['Medium'] / 100 * total)
-        flat = np.zeros(total, dtype=float)
-        flat[n_weak:n_weak + n_medium] = 0.5
-        flat[n_weak + n_medium:] = 1.0
-        np.random.shuffle(flat)
-        intensity = gaussian_filter(flat.reshape(H, W), sigma=smoothness)
-        mi, ma = intensity.min(), intensity.max()
-        intensity = (intensity - mi) / (ma - mi) if ma > mi else intensity
-    cmap = LinearSegmentedColormap.from_list('grad', colors, N=256)
-    return cmap(intensity)
-
-def overlay_circular_particles(colored_map, val, spot_color, r=1):
-    H, W, _ = colored_map.shape
-    num_spots = int(H * W * (val / 100.0))
-    overlay = colored_map.copy()
-    all_coords = [(x, y) for x in range(W) for y in range(H)]
-    centers = random.sample(all_coords, num_spots)
-    for x, y in centers:
-        for i in range(max(0, x - r), min(W, x + r + 1)):
-            for j in range(max(0, y - r), min(H, y + r + 1)):
-                if (i - x)**2 + (j - y)**2 <= r*r:
-                    overlay[j, i, :3] = spot_color
-                    overlay[j, i, 3] = 1.0
-    return overlay
+from catmap.gradient import create_gradient_distribution
+from catmap.particles import overlay_circular_particles
 
 # Catalyst data
 gradient_specs = {
@@ -1,40 +1,9 @@
-import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
-from scipy.ndimage import gaussian_filter
-from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
 
-def create_gradient_distribution(percentages, colors, size=(100, 300), smoothness=5):
-    """
-    Build a 2D intensity_map (H×W) from percentages dict and then color it
-    with a custom colormap defined by colors (3 RGB stops).
-    """
-    H, W = size
-    total = H * W
-
-    # Compute counts for each category
-    n_weak   = int(percentages['Weak']   / 100 * total)
-    n_medium = int(percentages['Medium'] / 100 * total)
-    n_high   = total - (n_weak + n_medium)
-
-    # Flat array: 0=weak, 0.5=medium, 1=high
-    flat = np.zeros(total, dtype=float)
-    flat[n_weak:n_weak + n_medium] = 0.5
-    flat[n_weak + n_medium:]      = 1.0
-    np.random.shuffle(flat)
-
-    # Reshape and smooth
-    intensity_map = flat.reshape(H, W)
-    intensity_map = gaussian_filter(intensity_map, sigma=smoothness)
-    intensity_map = (intensity_map - intensity_map.min()) / (
-        intensity_map.max() - intensity_map.min()
-    )
-
-    # Custom colormap
-    cmap = LinearSegmentedColormap.from_list("grad", colors, N=256)
-    colored_map = cmap(intensity_map)
-
-    return intensity_map, colored_map
+from catmap.cylinder import build_cylinder
+from catmap.gradient import colorize, gradient_intensity
+from catmap.lod import mesh_counts, resample_texture, surface_pixels
+from catmap.mesh import mesh_buffers
 
 # ─── Catalyst data & contrasting gradients ─────────────────────────────────────
 catalysts_data = {
@@ -51,45 +20,42 @@ gradient_colors = {
     "NiO@CeO2":  [(1.0,0.8,0.8), (0.9,0.0,0.0), (0.6,0.0,0.0)]   # pink → deep red
 }
 
-# ─── Cylinder mesh (shared) ───────────────────────────────────────────────────
+# ─── Cylinder mesh ────────────────────────────────────────────────────────────
 radius = 1.0
 height = 4.0
-n_u = 300   # angular resolution
+n_u = 300   # angular resolution (full detail; small subplots use fewer)
 n_v = 100   # vertical resolution
 
-u = np.linspace(0, 2*np.pi, n_u)
-v = np.linspace(-height/2, height/2, n_v)
-U, V = np.meshgrid(u, v)            # shape (n_v, n_u)
-X0 = radius * np.cos(U)
-Y0 = radius * np.sin(U)
-Z0 = V
-
 # radial bump scale
 bump_scale = 0.0 #change to 0.5
 
 # ─── Plot all four catalyst ───────────────────────────────────────────────────
 fig = plt.figure(figsize=(14, 12))
+buffers = {}  # mesh arrays, reused by every cylinder of the same resolution
 
 for idx, cat in enumerate(catalysts_data.keys()):
     perc = catalysts_data[cat]
     cols = gradient_colors[cat]
 
+    ax = fig.add_subplot(2, 2, idx+1, projection='3d')
+
+    # mesh detail the subplot can show
+    lod_u, lod_v = mesh_counts(surface_pixels(ax), (n_u, n_v))
+
     # get gradient distribution for this catalyst
-    intensity_map, colored_map = create_gradient_distribution(
-        perc, cols, size=(n_v, n_u), smoothness=8
-    )
+    intensity_map = gradient_intensity(perc, size=(n_v, n_u), smoothness=8)
+    intensity_map = resample_texture(intensity_map, (lod_v, lod_u))
+    colored_map = colorize(intensity_map, cols)
 
     # perturb radius by intensity
-    R = radius + bump_scale * intensity_map
-    X = R * np.cos(U)
-    Y = R * np.sin(U)
-    Z = V
+    X, Y, Z = build_cylinder(intensity_map, radius=radius, height=height,
+                             bump_scale=bump_scale,
+                             out=mesh_buffers((lod_v, lod_u), intensity_map.dtype, buffers))
 
-    ax = fig.add_subplot(2, 2, idx+1, projection='3d')
     ax.plot_surface(
         X, Y, Z,
         facecolors=colored_map,
-        rcount=n_v, ccount=n_u,
+        rcount=lod_v, ccount=lod_u,
         linewidth=0, antialiased=False
     )
     ax.set_title(cat, fontsize=14)
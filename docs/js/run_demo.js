@@ -1,7 +1,65 @@
 
 /* docs/js/run_demo.js
- * Generic helper: fetch .py, pass JSON args, show the PNG result.
+ * Generic helper: import a demo .py module once, call its render(args) on
+ * every run and paint the raw RGBA pixels it returns onto a canvas.
  */
+
+/* the catmap package the demo scripts import; copied into Pyodide's FS once.
+ * docs/py/catmap holds a copy of these files: run docs/sync_package.py after
+ * changing catmap/ or this list. */
+const PACKAGE = "catmap";
+const PACKAGE_MODULES = [
+  "__init__.py", "instrument.py", "palettes.py", "blur.py", "gradient.py", "particles.py",
+  "dispersion.py", "poisson.py", "grid.py", "mesh.py", "sphere.py", "cylinder.py",
+  "lod.py",
+  "render.py",
+];
+const MODULE_DIR = "/home/pyodide/";
+let sharedInstalled = false;
+const demoModules = {};   /* pyFile → imported module, kept warm between runs */
+
+async function installShared(py, base) {
+  if (sharedInstalled) return;
+  const dir = MODULE_DIR + PACKAGE + "/";
+  py.FS.mkdirTree(dir);
+  for (const name of PACKAGE_MODULES) {
+    const resp = await fetch(base + PACKAGE + "/" + name);
+    if (!resp.ok) throw new Error(PACKAGE + "/" + name + " not found");
+    py.FS.writeFile(dir + name, await resp.text());
+  }
+  py.runPython(`
+import sys
+if "${MODULE_DIR}" not in sys.path:
+    sys.path.insert(0, "${MODULE_DIR}")
+`);
+  sharedInstalled = true;
+}
+
+/* fetch and import a demo script the first time it is run */
+async function loadDemo(py, base, pyFile) {
+  if (demoModules[pyFile]) return demoModules[pyFile];
+  const resp = await fetch(base + pyFile);
+  if (!resp.ok) throw new Error(pyFile + " not found");
+  py.FS.writeFile(MODULE_DIR + pyFile, await resp.text());
+  demoModules[pyFile] = py.pyimport(pyFile.replace(/\.py$/, ""));
+  return demoModules[pyFile];
+}
+
+/* draw {width, height, rgba} from render(args, raw=True) into a canvas */
+function showPixels(outDiv, result) {
+  const width = result.get("width"), height = result.get("height");
+  const rgba = result.get("rgba");
+  const view = rgba.getBuffer("u8clamped");
+  try {
+    const canvas = document.createElement("canvas");
+    canvas.width = width; canvas.height = height;
+    canvas.getContext("2d").putImageData(new ImageData(view.data, width, height), 0, 0);
+    outDiv.replaceChildren(canvas);
+  } finally {
+    view.release(); rgba.destroy();
+  }
+}
+
 export async function runDemo(pyFile, defaults = {}) {
   const status = document.getElementById("status");
   const outDiv = document.getElementById("output");
@@ -21,33 +79,35 @@ export async function runDemo(pyFile, defaults = {}) {
 
   /* correct relative path to the .py file */
   const base = location.pathname.includes("/demos/") ? "../py/" : "py/";
-  const resp = await fetch(base + pyFile);
-  if (!resp.ok) { status.textContent = "❌ Python file not found"; return; }
-  const src = await resp.text();
+  try {
+    await installShared(py, base);
+  } catch (e) {
+    status.textContent = "❌ catmap package not found"; console.error(e); return;
+  }
+  let demo;
+  try {
+    demo = await loadDemo(py, base, pyFile);
+  } catch (e) {
+    status.textContent = "❌ Python file not found"; console.error(e); return;
+  }
 
   /* gather form values */
   const fd = new FormData(document.getElementById("demoForm"));
   const args = { ...defaults };
   for (const [k, v] of fd.entries()) if (v !== "") args[k] = v;
 
-  /* wrap script so it *returns* the PNG (not print) */
-  const code = `
-import matplotlib, base64, io, json
-matplotlib.use("Agg")
-args = json.loads(${JSON.stringify(JSON.stringify(args))})
-${src}
-buf = io.BytesIO()
-import matplotlib.pyplot as _plt
-_plt.savefig(buf, format="png", bbox_inches="tight")
-base64.b64encode(buf.getvalue()).decode()
-`;
-
+  /* render in the warm module; raw pixels skip the PNG + base64 round trip */
+  let pyArgs, result;
   try {
     status.textContent = "▶️ Running…";
-    const png64 = await py.runPythonAsync(code);
-    outDiv.innerHTML = '<img src="data:image/png;base64,' + png64 + '"/>';
+    pyArgs = py.toPy(args);
+    result = demo.render.callKwargs(pyArgs, { raw: true });
+    showPixels(outDiv, result);
     status.textContent = "✅ Done";
   } catch (err) {
     status.textContent = "❌ Python error – see console"; console.error(err);
+  } finally {
+    if (pyArgs) pyArgs.destroy();
+    if (result) result.destroy();
   }
 }
\ No newline at end of file
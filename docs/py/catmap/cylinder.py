@@ -0,0 +1,32 @@
+"""
+Cylinder meshes wrapped with a gradient intensity map.
+"""
+import numpy as np
+
+from . import instrument
+from .mesh import mesh_buffers, unit_cylinder
+
+
+def build_cylinder(intensity_map, radius=1.0, height=4.0, bump_scale=0.0, out=None):
+    """
+    Cylinder surface with one vertex per pixel of intensity_map (n_v × n_u):
+    columns run around the circumference, rows along the height. The radius
+    is pushed out by bump_scale * intensity. Returns X, Y, Z, float32 for a
+    float32 (compact) intensity map and float64 otherwise, written into out
+    (see catmap.mesh.mesh_buffers) if given. The trig tables are cached per
+    resolution.
+    """
+    intensity_map = np.asarray(intensity_map)
+    dtype = np.dtype(np.float32 if intensity_map.dtype == np.float32 else float)
+    n_v, n_u = intensity_map.shape
+    cos_u, sin_u, v = unit_cylinder(n_u, n_v, float(height), dtype)
+    X, Y, Z = mesh_buffers((n_v, n_u), dtype) if out is None else out
+
+    # perturb radius by intensity; R lives in Z until the heights go in
+    with instrument.stage("mesh"):
+        R = np.multiply(dtype.type(bump_scale), intensity_map, out=Z)
+        R += dtype.type(radius)
+        np.multiply(R, cos_u, out=X)
+        np.multiply(R, sin_u, out=Y)
+        Z[...] = v[:, None]
+    return X, Y, Z
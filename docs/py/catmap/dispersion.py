@@ -0,0 +1,110 @@
+"""
+Fresh vs reduced Ni dispersion maps: crisp circular spots with a radial fade
+on a light gray background.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from . import instrument
+from .poisson import poisson_disk_centers
+
+
+@lru_cache(maxsize=None)
+def fade_kernel(radius):
+    """
+    Pixel offsets inside a spot of the given radius and their radial fade
+    1 - (d / radius)**2, computed once per radius.
+    """
+    d = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(d, d, indexing='ij')
+    dist = np.hypot(dx, dy)
+    inside = dist <= radius
+    kernel = (dy[inside], dx[inside], 1 - (dist[inside] / radius) ** 2)
+    for a in kernel:
+        a.setflags(write=False)
+    return kernel
+
+
+def create_dispersion_distribution(fresh_value, reduced_value,
+                                   fresh_color, reduced_color,
+                                   size=200, rng=None, compact=False, placement="random",
+                                   return_coverage=False):
+    """
+    Create an RGBA array with random circular spots for fresh vs reduced catalysts.
+    No blurring; spots have crisp edges. compact gives uint8 RGBA instead of
+    float64; the spots are the same. placement="poisson" keeps the spots
+    from overlapping (see catmap.poisson); spots with no room are dropped.
+
+    Returns the map and the fresh and reduced shares of the total, in percent.
+    return_coverage=True adds the measured (fresh, reduced) coverage: the
+    percent of the map's pixels showing a fresh or a reduced spot.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    scale = 255 if compact else 1.0
+    rgba = np.full((size, size, 4), scale, dtype=np.uint8 if compact else float)  # white, alpha=1
+
+    # compute ratios
+    total = fresh_value + reduced_value
+    fresh_ratio = fresh_value / total if total > 0 else 0
+    reduced_ratio = reduced_value / total if total > 0 else 0
+
+    # number of spots (5% coverage scaled by ratio)
+    num_fresh_spots = int(size * size * 0.05 * fresh_ratio)
+    num_reduced_spots = int(size * size * 0.05 * reduced_ratio)
+
+    # draw every spot's parameters in bulk; fresh spots come first, reduced
+    # spots after them, so reduced spots overwrite fresh ones
+    n = num_fresh_spots + num_reduced_spots
+    if placement == "poisson":
+        radius = rng.integers(2, 7, n)
+        y, x, placed = poisson_disk_centers((size, size), radius, rng)
+    elif placement == "random":
+        x = rng.integers(0, size, n)
+        y = rng.integers(0, size, n)
+        radius = rng.integers(2, 7, n)
+    else:
+        raise ValueError(f"unknown placement {placement!r}, expected 'random' or 'poisson'")
+    value = np.repeat([fresh_value, reduced_value], [num_fresh_spots, num_reduced_spots])
+    color = np.repeat([fresh_color, reduced_color], [num_fresh_spots, num_reduced_spots], axis=0)
+    color = color * ((0.5 + rng.random(n) * 0.5) * value * 2)[:, None]
+    num_fresh = num_fresh_spots
+    if placement == "poisson":
+        x, y, radius, color = x[placed], y[placed], radius[placed], color[placed]
+        n = x.size
+        num_fresh = np.count_nonzero(placed[:num_fresh_spots])
+
+    # stamp each radius group at once, then keep only the last spot per pixel
+    fresh_pixels = reduced_pixels = 0
+    with instrument.stage("stamp"):
+        pix, order, rgb = [], [], []
+        for r in np.unique(radius):
+            (k,) = np.nonzero(radius == r)
+            dy, dx, fade = fade_kernel(int(r))
+            ys = y[k, None] + dy
+            xs = x[k, None] + dx
+            inside = (ys >= 0) & (ys < size) & (xs >= 0) & (xs < size)
+            pix.append((ys * size + xs)[inside])
+            order.append(np.broadcast_to(k[:, None], ys.shape)[inside])
+            rgb.append((color[k, None, :] * fade[None, :, None])[inside])
+        if n:
+            pix, order, rgb = np.concatenate(pix), np.concatenate(order), np.concatenate(rgb)
+            last = np.full(size * size, -1)
+            np.maximum.at(last, pix, order)
+            win = order == last[pix]
+            rgb = np.clip(rgb[win], 0, 1)
+            rgba.reshape(-1, 4)[pix[win], :3] = np.rint(rgb * scale) if compact else rgb
+            # one winner per stamped pixel
+            fresh_pixels = np.count_nonzero(order[win] < num_fresh)
+            reduced_pixels = rgb.shape[0] - fresh_pixels
+
+    # light gray background for untouched pixels
+    bg = np.ones(size * size, dtype=bool)
+    if n:
+        bg[pix] = False
+    rgba.reshape(-1, 4)[bg, :3] = np.rint(0.95 * scale) if compact else 0.95
+
+    if return_coverage:
+        coverage = (fresh_pixels / (size * size) * 100, reduced_pixels / (size * size) * 100)
+        return rgba, fresh_ratio * 100, reduced_ratio * 100, coverage
+    return rgba, fresh_ratio * 100, reduced_ratio * 100
@@ -0,0 +1,397 @@
+"""
+Gradient elemental maps.
+
+A map is built in stages: a shuffled label field holding the exact
+Weak/Medium/High counts (0, 0.5, 1), a Gaussian blur normalized to [0, 1],
+and a 3-stop catalyst palette applied to the result.
+
+Each palette is compiled once into 256-entry RGBA lookup tables (uint8,
+float32 or float64, see palette_lut): a map is colored by quantizing its
+intensity into table indices and gathering rows with np.take, giving the
+same colors as the equivalent LinearSegmentedColormap. palette_cmap wraps
+the same table for colorbars.
+
+The blurred intensity and the colored map keep bounded LRU caches keyed by
+(percentages, size, smoothness, seed), the lookup tables by the palette, so
+re-colouring or re-overlaying a catalyst skips the blur. seed=None means
+fresh randomness on every call and bypasses the caches, and so do maps
+over CACHE_PIXELS: every entry is a whole map, so large ones would hold
+hundreds of MB for results that are rarely asked for twice. Cached arrays
+are read-only; copy before modifying.
+
+compact=True runs the same pipeline in small types: int8 labels (0, 1, 2),
+float32 intensity and uint8 RGBA, 4-8x less memory than float64.
+
+mode="quantile" replaces the label field and blur: uniform noise is blurred
+once and cut at the exact Weak/Medium/High quantiles (found with
+np.partition), then remapped monotonically into the Weak (< 0.25), Medium
+and High (>= 0.75) bands. The finished map has exactly the requested
+shares under measure_percentages, with no need to measure and retry.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from . import instrument
+from .blur import resolve_gaussian_filter
+from .palettes import LEVELS
+
+
+# maps with more pixels than this are not cached (about 32 MB at most held)
+CACHE_PIXELS = 256 * 256
+
+
+def _stage(fn, seed, shape):
+    """fn itself, or its uncached version for seed=None and large maps."""
+    if seed is None or shape[0] * shape[1] > CACHE_PIXELS:
+        return fn.__wrapped__
+    return fn
+
+
+def _frozen(a):
+    a.setflags(write=False)
+    return a
+
+
+def _shape(size):
+    return (size, size) if np.isscalar(size) else tuple(size)
+
+
+def percentages_key(percentages):
+    return tuple(float(percentages[k]) for k in LEVELS)
+
+
+def palette_key(colors):
+    return tuple(tuple(float(c) for c in color) for color in colors)
+
+
+def _rgba_dtype(compact):
+    return np.dtype(np.uint8 if compact else float)
+
+
+def _label_field(pct, shape, seed, compact=False):
+    H, W = shape
+    total = H * W
+    n_weak, n_medium, _ = level_counts(pct, total)
+    if compact:
+        flat = np.full(total, 2, dtype=np.int8)
+        flat[:n_weak] = 0
+        flat[n_weak:n_weak + n_medium] = 1
+    else:
+        flat = np.zeros(total, dtype=float)
+        flat[n_weak:n_weak + n_medium] = 0.5
+        flat[n_weak + n_medium:] = 1.0
+    with instrument.stage("shuffle"):
+        np.random.default_rng(seed).shuffle(flat)
+    return _frozen(flat.reshape(H, W))
+
+
+# Weak, Medium and High output bands of the quantile mode; the gaps keep
+# values off the 0.25 and 0.75 rounding boundaries of measure_percentages
+QUANTILE_BANDS = ((0.0, 0.24), (0.26, 0.74), (0.76, 1.0))
+
+
+def level_counts(pct, total):
+    """Pixel counts of Weak, Medium and High; rounding leftovers go to High."""
+    n_weak = int(pct[0] / 100 * total)
+    n_medium = int(pct[1] / 100 * total)
+    return n_weak, n_medium, total - n_weak - n_medium
+
+
+def cut_at_quantiles(field, pct):
+    """
+    Remap field monotonically so its lowest Weak share of pixels falls in the
+    Weak band, the next Medium share in the Medium band and the rest in the
+    High band, each band stretched linearly over its values. The two cut
+    values are order statistics from one np.partition call, O(N) overall;
+    pixels tied with a cut value are split in raster order to keep the
+    counts exact.
+    """
+    flat = field.ravel()
+    n = flat.size
+    n_weak, n_medium, _ = level_counts(pct, n)
+    ranks = (n_weak, n_weak + n_medium)
+    kth = [k for k in ranks if k < n]
+    part = np.partition(flat, kth) if kth else flat
+    cuts = [part[k] if k < n else np.inf for k in ranks]
+
+    level = np.digitize(flat, cuts).astype(np.int8)  # 0 below cuts[0], 2 from cuts[1] up
+    for i, (k, cut) in enumerate(zip(ranks, cuts)):
+        need = k - np.count_nonzero(level <= i)
+        if need > 0:
+            ties = np.flatnonzero((flat == cut) & (level > i))[:need]
+            level[ties] = i
+
+    vmin, vmax = flat.min(), flat.max()
+    low = np.minimum([vmin, cuts[0], cuts[1]], vmax).astype(field.dtype)
+    high = np.minimum([cuts[0], cuts[1], vmax], vmax).astype(field.dtype)
+    band_lo, band_hi = np.asarray(QUANTILE_BANDS, dtype=field.dtype).T
+    span = high - low
+    scale = np.where(span > 0, (band_hi - band_lo) / np.where(span > 0, span, 1), 0)
+    scale = scale.astype(field.dtype)
+    out = band_lo[level] + (flat - low[level]) * scale[level]
+    return np.clip(out, band_lo[level], band_hi[level]).reshape(field.shape)
+
+
+@lru_cache(maxsize=16)
+def _quantile_intensity(pct, shape, smoothness, seed, compact=False):
+    dtype = np.float32 if compact else float
+    noise = np.random.default_rng(seed).random(shape, dtype=dtype)
+    gaussian_filter = resolve_gaussian_filter()  # outside the timed blur: may import SciPy
+    with instrument.stage("blur"):
+        field = gaussian_filter(noise, sigma=smoothness).astype(dtype, copy=False)
+    with instrument.stage("quantile_cut"):
+        return _frozen(cut_at_quantiles(field, pct))
+
+
+@lru_cache(maxsize=16)
+def _intensity(pct, shape, smoothness, seed, compact=False, mode="labels"):
+    if mode == "quantile":
+        return _stage(_quantile_intensity, seed, shape)(pct, shape, smoothness, seed, compact)
+    if mode != "labels":
+        raise ValueError(f"unknown mode {mode!r}, expected 'labels' or 'quantile'")
+    dtype = np.float32 if compact else float
+    if 100 in pct:
+        # single intensity: uniform level with slight texture for visual interest
+        noise = np.random.default_rng(seed).random(shape) * 0.05
+        return _frozen(np.clip(pct.index(100) / 2 + noise, 0, 1).astype(dtype, copy=False))
+    labels = _label_field(pct, shape, seed, compact)
+    if compact:
+        labels = labels * np.float32(0.5)
+    gaussian_filter = resolve_gaussian_filter()
+    with instrument.stage("blur"):
+        intensity = gaussian_filter(labels, sigma=smoothness).astype(dtype, copy=False)
+    mi, ma = intensity.min(), intensity.max()
+    if ma > mi:  # avoid division by zero
+        intensity = (intensity - mi) / (ma - mi)
+    return _frozen(intensity)
+
+
+# ─── Palettes ─────────────────────────────────────────────────────────────────
+
+LUT_SIZE = 256
+
+
+@lru_cache(maxsize=32)
+def _palette_table(colors):
+    from matplotlib.colors import LinearSegmentedColormap
+    cmap = LinearSegmentedColormap.from_list('grad', colors, N=LUT_SIZE)
+    return _frozen(cmap(np.arange(LUT_SIZE)))
+
+
+@lru_cache(maxsize=64)
+def _palette_lut(colors, dtype):
+    table = _palette_table(colors)
+    if dtype == np.uint8:
+        # the truncation Colormap.__call__(..., bytes=True) applies
+        return _frozen((table * 255).astype(np.uint8))
+    return table if dtype == table.dtype else _frozen(table.astype(dtype))
+
+
+@lru_cache(maxsize=32)
+def _palette_cmap(colors):
+    from matplotlib.colors import ListedColormap
+    return ListedColormap(_palette_table(colors), name='grad')
+
+
+def _lut_index(intensity):
+    """Table row of each value, as Colormap.__call__ picks it: min(int(x * 256), 255), from 0."""
+    x = np.asarray(intensity)
+    idx = np.multiply(x, LUT_SIZE, dtype=x.dtype if x.dtype.kind == 'f' else float)
+    np.clip(idx, 0, LUT_SIZE - 1, out=idx)
+    return idx.astype(np.intp)  # take casts narrower indices itself, and slower
+
+
+def _gather(table, idx, out=None):
+    """table rows at idx (in range), shaped idx.shape + (4,)."""
+    # take buffers out= unless the mode is "clip"
+    if table.dtype != np.uint8:
+        return np.take(table, idx, axis=0, out=out, mode='clip' if out is not None else 'raise')
+    # a uint8 RGBA row is one 4-byte word: gather words, not rows
+    words = np.ascontiguousarray(table).view(np.uint32).reshape(-1)
+    if out is None:
+        return np.take(words, idx).view(np.uint8).reshape(idx.shape + (4,))
+    np.take(words, idx, out=out.view(np.uint32).reshape(idx.shape), mode='clip')
+    return out
+
+
+def palette_lut(colors, dtype=np.uint8):
+    """
+    The palette's 256 RGBA entries as a read-only (256, 4) table of dtype
+    uint8, float32 or float64, compiled once per palette and dtype.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.uint8, np.float32, np.float64):
+        raise ValueError(f"dtype must be uint8, float32 or float64, not {dtype}")
+    return _palette_lut(palette_key(colors), dtype)
+
+
+def apply_lut(intensity, lut, out=None):
+    """
+    Color an intensity map in [0, 1] through a palette_lut table: the
+    RGBA rows Colormap.__call__ would pick, in the table's dtype.
+    """
+    return _gather(lut, _lut_index(intensity), out)
+
+
+@lru_cache(maxsize=8)
+def _colored(pct, shape, smoothness, seed, colors, compact=False, mode="labels"):
+    intensity = _stage(_intensity, seed, shape)(pct, shape, smoothness, seed, compact, mode)
+    with instrument.stage("colormap"):
+        return _frozen(apply_lut(intensity, _palette_lut(colors, _rgba_dtype(compact))))
+
+
+def label_field(percentages, size=200, seed=None, compact=False):
+    """
+    Shuffled field of 0 (Weak), 0.5 (Medium) and 1 (High) in exact
+    proportions; int8 codes 0, 1 and 2 when compact.
+    """
+    return _label_field(percentages_key(percentages), _shape(size), seed, compact)
+
+
+def gradient_intensity(percentages, size=200, smoothness=2, seed=None, compact=False,
+                       mode="labels"):
+    """
+    Blurred label field normalized to [0, 1]; size is an int or (H, W).
+    mode="quantile" gives blurred noise cut at the exact level shares instead.
+    """
+    shape = _shape(size)
+    return _stage(_intensity, seed, shape)(percentages_key(percentages), shape,
+                                           smoothness, seed, compact, mode)
+
+
+def palette_cmap(colors):
+    """Colormap over the palette's compiled table, for colorbars."""
+    return _palette_cmap(palette_key(colors))
+
+
+def colorize(intensity, colors, compact=False):
+    """Apply the palette to an intensity map, giving RGBA (uint8 if compact)."""
+    with instrument.stage("colormap"):
+        return apply_lut(intensity, _palette_lut(palette_key(colors), _rgba_dtype(compact)))
+
+
+def create_gradient_distribution(percentages, colors, size=200, smoothness=2, seed=None,
+                                 compact=False, mode="labels"):
+    """
+    RGBA gradient map of the Weak/Medium/High percentages colored with the
+    3-stop palette colors. size is an int or (H, W). compact gives uint8
+    RGBA computed from float32 intensity; mode="quantile" makes the map's
+    measured shares match the percentages exactly.
+    """
+    if seed is None:
+        return colorize(gradient_intensity(percentages, size, smoothness, compact=compact,
+                                           mode=mode),
+                        colors, compact)
+    shape = _shape(size)
+    return _stage(_colored, seed, shape)(percentages_key(percentages), shape, smoothness, seed,
+                                         palette_key(colors), compact, mode)
+
+
+# ─── Batches ──────────────────────────────────────────────────────────────────
+
+def _batch_percentages(percentages):
+    if len(percentages) and isinstance(percentages[0], dict):
+        return np.array([percentages_key(p) for p in percentages], dtype=float)
+    pct = np.asarray(percentages, dtype=float)
+    if pct.ndim != 2 or pct.shape[1] != 3:
+        raise ValueError(f"percentages must have shape (N, 3), not {pct.shape}")
+    return pct
+
+
+def _batch_intensity(pct, shape, smoothness, rng, compact=False):
+    """(N, H, W) intensities for the rows of pct, as gradient_intensity makes them."""
+    n = len(pct)
+    H, W = shape
+    total = H * W
+    dtype = np.float32 if compact else float
+    out = np.empty((n, H, W), dtype=dtype)
+
+    # single intensity: uniform level with slight texture, as in _intensity
+    uniform = (pct == 100).any(axis=1)
+    for i in np.flatnonzero(uniform):
+        level = list(pct[i]).index(100) / 2
+        out[i] = np.clip(level + rng.random(shape) * 0.05, 0, 1)
+
+    rows = np.flatnonzero(~uniform)
+    if rows.size:
+        labels = np.empty((rows.size, total), dtype=dtype)
+        with instrument.stage("shuffle"):
+            for flat, p in zip(labels, pct[rows]):
+                counts = level_counts(p, total)
+                # exact counts: the largest level fills the map and the other
+                # two take distinct random pixels, cheaper than a full shuffle
+                fill, first, second = np.argsort(counts, kind='stable')[::-1]
+                flat.fill(fill * 0.5)
+                picks = rng.choice(total, counts[first] + counts[second], replace=False)
+                flat[picks[:counts[first]]] = first * 0.5
+                flat[picks[counts[first]:]] = second * 0.5
+        labels = labels.reshape(-1, H, W)
+        # blur the spatial axes only: sigma 0 leaves the stack axis alone
+        gaussian_filter = resolve_gaussian_filter()
+        with instrument.stage("blur"):
+            blurred = gaussian_filter(labels, sigma=(0, smoothness, smoothness))
+        blurred = blurred.astype(dtype, copy=False)
+        mi = blurred.min(axis=(1, 2), keepdims=True)
+        ma = blurred.max(axis=(1, 2), keepdims=True)
+        span = ma - mi
+        out[rows] = np.where(span > 0, (blurred - mi) / np.where(span > 0, span, 1), blurred)
+    return out
+
+
+# pixels per batch of maps: keeps the stack about cache-sized
+BATCH_PIXELS = 1 << 18
+
+
+def create_gradient_batch(percentages, colors, size=200, smoothness=2, seed=None,
+                          compact=False, batch=None):
+    """
+    Gradient maps of N catalysts at once, as an (N, H, W, 4) RGBA array.
+
+    percentages is an (N, 3) array of Weak, Medium, High percentages (or a
+    list of N dicts); colors is one 3-stop palette for every map or a list
+    of N. Maps are made batch at a time (default: about BATCH_PIXELS pixels'
+    worth): exact-count labels go into one stack, which is blurred over its
+    spatial axes in a single gaussian_filter call, normalized per map and
+    colored through one gather from the maps' stacked palette tables. Each
+    map has the levels, blur and colors create_gradient_distribution gives
+    it; seed seeds the whole run, so the random layouts differ from those
+    of single-catalyst calls.
+    """
+    pct = _batch_percentages(percentages)
+    n = len(pct)
+    H, W = _shape(size)
+    if len(colors) == n and np.ndim(colors[0]) == 2:
+        palettes = [palette_key(c) for c in colors]
+    else:
+        palettes = [palette_key(colors)] * n
+    rng = np.random.default_rng(seed)
+    batch = batch or max(1, BATCH_PIXELS // (H * W))
+    out = np.empty((n, H, W, 4), dtype=np.uint8 if compact else float)
+
+    for start in range(0, n, batch):
+        stop = min(n, start + batch)
+        intensity = _batch_intensity(pct[start:stop], (H, W), smoothness, rng, compact)
+        # palette lookup with each map's own table stacked into one:
+        # index = map * 256 + min(int(x * 256), 255)
+        table = np.concatenate([_palette_lut(p, _rgba_dtype(compact))
+                                for p in palettes[start:stop]])
+        with instrument.stage("colormap"):
+            intensity *= LUT_SIZE
+            idx = np.minimum(intensity.astype(np.intp), LUT_SIZE - 1)
+            idx += LUT_SIZE * np.arange(stop - start)[:, None, None]
+            _gather(table, idx, out=out[start:stop])
+    return out
+
+
+def measure_percentages(intensity):
+    """Weak/Medium/High shares of a map after rounding it to 0, 0.5 or 1."""
+    sampled = np.rint(np.asarray(intensity) * 2).astype(np.intp)
+    counts = np.bincount(sampled.ravel(), minlength=3)
+    return {level: counts[i] / sampled.size * 100 for i, level in enumerate(LEVELS)}
+
+
+def clear_caches():
+    for stage in (_intensity, _quantile_intensity, _palette_table, _palette_lut, _palette_cmap,
+                  _colored):
+        stage.cache_clear()
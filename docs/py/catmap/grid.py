@@ -0,0 +1,51 @@
+"""
+Categorical basicity grids: every cell is Weak, Medium or High and drawn as
+a lighter or darker shade (alpha) of one base color.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .palettes import LEVELS
+
+SHADE_ALPHA = {"Weak": 0.3, "Medium": 0.6, "High": 1.0}
+
+
+def get_shade_color(base_color, intensity):
+    """RGBA shade of base_color for the Weak, Medium or High intensity."""
+    from matplotlib.colors import to_rgb
+    return to_rgb(base_color) + (SHADE_ALPHA[intensity],)
+
+
+@lru_cache(maxsize=None)
+def get_shade_lut(base_color, dtype=float):
+    """RGBA lookup table with one row per intensity level, built once per base color."""
+    lut = np.array([get_shade_color(base_color, intensity) for intensity in LEVELS])
+    if np.dtype(dtype) == np.uint8:
+        lut = np.round(lut * 255)
+    lut = lut.astype(dtype)
+    lut.setflags(write=False)
+    return lut
+
+
+def create_distribution_grid(percentages, base_color, grid_size=100, dtype=float, rng=None):
+    """
+    Return a (grid_size, grid_size, 4) RGBA grid of shuffled Weak/Medium/High
+    cells. dtype=np.uint8 gives 0-255 channels instead of 0-1 floats.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    total_cells = grid_size * grid_size
+
+    # Calculate the number of cells for each category
+    weak_cells = int(total_cells * percentages["Weak"] / 100)
+    medium_cells = int(total_cells * percentages["Medium"] / 100)
+    high_cells = int(total_cells * percentages["High"] / 100)
+
+    # Label each cell 0 (Weak), 1 (Medium) or 2 (High); rounding leftovers stay Weak
+    flat_grid = np.zeros(total_cells, dtype=np.intp)
+    flat_grid[weak_cells:weak_cells + medium_cells] = 1
+    flat_grid[weak_cells + medium_cells:weak_cells + medium_cells + high_cells] = 2
+    rng.shuffle(flat_grid)
+
+    # Map labels to colors in one gather
+    return get_shade_lut(base_color, dtype)[flat_grid.reshape((grid_size, grid_size))]
@@ -0,0 +1,153 @@
+"""
+Opt-in per-stage timing and memory records for the render pipeline.
+
+The generators and figure builders wrap their stages (shuffle, blur,
+colormap, overlay, mesh, plot_surface, savefig, ...) in stage(name). While
+instrumentation is off, stage() hands back one shared no-op context manager,
+so the hooks can stay in production code. enable() turns it on: every stage
+that runs then emits a record
+
+    {"stage": "blur", "path": "render/blur", "seconds": 0.012,
+     "catalyst": "NiO@SiO2", "kind": "heatmap", "pid": 4242}
+
+to the hook callables and/or as a JSON line appended to a file. path is the
+chain of enclosing stages, fields set with context() (the CLI sets the
+catalyst and figure kind) are merged in, and with memory=True the record
+gets "peak_bytes", the tracemalloc peak above the stage's starting point
+(nested stages included). Stages served from a cache do not run and leave
+no record. StageTotals adds records up into call counts, total time and
+largest peak per catalyst and stage.
+
+    python -m catmap table.csv --kind all --profile stages.jsonl
+"""
+import json
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+_NULL = nullcontext()
+_hooks = []     # no hooks: instrumentation off
+_memory = False
+_path = None
+_file = None
+_stack = []     # open stages, innermost last
+_context = {}
+
+
+class _Stage:
+    __slots__ = ("name", "start", "base", "peak")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:  # bank the parent's peak before restarting the count
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.base = self.peak = current
+        _stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        path = "/".join(s.name for s in _stack)
+        _stack.pop()
+        record = dict(_context, stage=self.name, path=path, seconds=seconds, pid=os.getpid())
+        if _memory:
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            record["peak_bytes"] = peak - self.base
+        for hook in _hooks:
+            hook(record)
+        return False
+
+
+class _Context:
+    __slots__ = ("fields", "saved")
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __enter__(self):
+        self.saved = dict(_context)
+        _context.update(self.fields)
+        return self
+
+    def __exit__(self, *exc):
+        _context.clear()
+        _context.update(self.saved)
+        return False
+
+
+def stage(name):
+    """Context manager timing one pipeline stage; a no-op unless enabled."""
+    return _Stage(name) if _hooks else _NULL
+
+
+def context(**fields):
+    """Context manager adding fields (catalyst, kind, ...) to the records inside it."""
+    return _Context(fields) if _hooks else _NULL
+
+
+def enabled():
+    return bool(_hooks)
+
+
+def _write_line(record):
+    _file.write(json.dumps(record) + "\n")
+    _file.flush()
+
+
+def enable(hook=None, path=None, memory=False):
+    """
+    Start emitting stage records to hook (a callable taking the record dict)
+    and/or as JSON lines appended to path. memory=True adds tracemalloc
+    peaks, starting tracemalloc if needed; it slows allocation-heavy stages.
+    """
+    global _memory, _path, _file
+    disable()
+    if hook is None and path is None:
+        raise ValueError("enable() needs a hook, a path or both")
+    if path is not None:
+        _path = path
+        _file = open(path, "a")
+        _hooks.append(_write_line)
+    if hook is not None:
+        _hooks.append(hook)
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    """Stop emitting records and close the JSON lines file."""
+    global _memory, _path, _file
+    _hooks.clear()
+    _stack.clear()
+    if _file is not None:
+        _file.close()
+    _memory, _path, _file = False, None, None
+
+
+def settings():
+    """enable() arguments that recreate the file output in another process, or None."""
+    return {"path": _path, "memory": _memory} if _path is not None else None
+
+
+class StageTotals:
+    """Hook adding records up per (catalyst, stage): calls, seconds and largest peak_bytes."""
+
+    def __init__(self):
+        self.totals = {}
+
+    def __call__(self, record):
+        key = (record.get("catalyst"), record["stage"])
+        total = self.totals.setdefault(key, {"calls": 0, "seconds": 0.0, "peak_bytes": 0})
+        total["calls"] += 1
+        total["seconds"] += record["seconds"]
+        total["peak_bytes"] = max(total["peak_bytes"], record.get("peak_bytes", 0))
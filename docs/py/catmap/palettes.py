@@ -0,0 +1,35 @@
+"""
+Intensity levels and the default catalyst color palettes.
+
+Gradient palettes are 3-stop RGB gradients (Weak, Medium, High); the demos
+cycle through them when there are more catalysts than palettes.
+"""
+
+LEVELS = ("Weak", "Medium", "High")
+
+GRADIENT_PALETTES = [
+    [(0.9, 0.8, 1.0), (0.7, 0.5, 0.9), (0.5, 0.2, 0.7)],  # Purple gradient
+    [(0.8, 0.9, 1.0), (0.3, 0.6, 0.9), (0.1, 0.3, 0.8)],  # Blue gradient
+    [(0.8, 1.0, 0.8), (0.4, 0.8, 0.4), (0.1, 0.6, 0.3)],  # Green gradient
+    [(1.0, 0.8, 0.8), (0.9, 0.4, 0.4), (0.7, 0.1, 0.1)],  # Red gradient
+]
+
+# higher-contrast gradients used on the cylinders
+CYLINDER_PALETTES = [
+    [(0.95, 0.8, 1.0), (0.6, 0.2, 0.9), (0.3, 0.0, 0.6)],  # purple → deep purple
+    [(0.8, 1.0, 1.0), (0.0, 0.6, 0.9), (0.0, 0.2, 0.5)],   # cyan → navy
+    [(0.8, 1.0, 0.8), (0.0, 0.8, 0.0), (0.0, 0.4, 0.0)],   # lime → dark green
+    [(1.0, 0.8, 0.8), (0.9, 0.0, 0.0), (0.6, 0.0, 0.0)],   # pink → deep red
+]
+
+# Ni particle colors drawn over the matching gradient palette
+SPOT_COLORS = [
+    (0.4, 0.1, 0.4),  # dark purple
+    (0.0, 0.0, 0.5),  # dark blue
+    (0.0, 0.4, 0.0),  # dark green
+    (0.5, 0.0, 0.0),  # dark red
+]
+
+# fresh vs reduced spots on the dispersion maps
+FRESH_COLOR = (0.0, 0.7, 0.2)    # bright green
+REDUCED_COLOR = (0.9, 0.1, 0.1)  # bright red
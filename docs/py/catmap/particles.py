@@ -0,0 +1,251 @@
+"""
+Ni particle overlays drawn over a gradient map.
+
+overlay_circular_particles stamps crisp solid disks; overlay_smooth_circles
+blends anti-aliased circles, part of them in clusters. Both draw every
+particle position up front and paint them in array operations.
+
+placement="random" puts centers at random pixels, where particles may pile
+up; placement="poisson" keeps every particle clear of the others (see
+catmap.poisson), dropping the ones that find no room.
+
+With return_coverage=True an overlay also returns the share of the map
+(in percent) its particles actually cover after overlaps and clipping,
+counted while stamping. overlay_circular_particles can instead stamp until
+a target_coverage is reached.
+
+Overlays keep the dtype of the map they are drawn on: float RGBA in [0, 1]
+or compact uint8 RGBA in [0, 255].
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from . import instrument
+from .poisson import poisson_disk_centers
+
+
+@lru_cache(maxsize=None)
+def disk_footprint(r):
+    """Row and column offsets of the pixels inside a disk of radius r."""
+    d = np.arange(-r, r + 1)
+    dy, dx = np.meshgrid(d, d, indexing='ij')
+    inside = dx**2 + dy**2 <= r*r
+    dy, dx = dy[inside], dx[inside]
+    dy.setflags(write=False)
+    dx.setflags(write=False)
+    return dy, dx
+
+
+def disk_pixels(centers, shape, r):
+    """Flat indices of the pixels of disks of radius r at flat centers, clipped to shape."""
+    H, W = shape
+    dy, dx = disk_footprint(r)
+    cy, cx = np.divmod(np.asarray(centers), W)
+    ys = (cy[:, None] + dy).ravel()
+    xs = (cx[:, None] + dx).ravel()
+    inside = (ys >= 0) & (ys < H) & (xs >= 0) & (xs < W)
+    return ys[inside] * W + xs[inside]
+
+
+def _full_scale(dtype):
+    """Value of an opaque/white channel: 255 for uint8 maps, 1.0 for float maps."""
+    return np.iinfo(dtype).max if np.issubdtype(dtype, np.integer) else 1.0
+
+
+def _check_placement(placement):
+    if placement not in ("random", "poisson"):
+        raise ValueError(f"unknown placement {placement!r}, expected 'random' or 'poisson'")
+
+
+def overlay_circular_particles(colored_map, val, spot_color, r=1, rng=None, batch=65536,
+                               placement="random", target_coverage=None,
+                               return_coverage=False):
+    """
+    Stamp num_spots = H*W*val/100 solid disks of radius r at distinct random
+    centers, or at non-overlapping ones with placement="poisson". Disks are
+    stamped batch centers at a time through scatter indexing; parts falling
+    outside the map are clipped, and pixels already covered are skipped.
+
+    With target_coverage (percent of the map) val is ignored: disks are
+    added batch by batch until they cover that share of the pixels, within
+    one disk's area (poisson placement stops short if the map is full).
+    return_coverage=True returns (overlay, covered percent).
+    """
+    _check_placement(placement)
+    rng = np.random.default_rng() if rng is None else rng
+    H, W, _ = colored_map.shape
+    overlay = colored_map.copy()
+    scale = _full_scale(overlay.dtype)
+    color = np.rint(np.asarray(spot_color) * scale) if scale != 1.0 else spot_color
+    flat = overlay.reshape(H * W, -1)
+    counting = return_coverage or target_coverage is not None
+    # nonzero once stamped; when counting, a pixel holds its (1-based) place
+    # among a batch's new pixels, so the places that stuck count each once
+    covered = np.zeros(H * W, dtype=np.int32 if counting else bool)
+
+    def stamp(centers):
+        """Paint the disks at centers; returns the number of pixels newly covered."""
+        pix = disk_pixels(centers, (H, W), r)
+        new = pix[covered[pix] == 0]
+        flat[new, :3] = color
+        flat[new, 3] = scale
+        if not counting:
+            covered[new] = True
+            return 0
+        place = np.arange(1, new.size + 1, dtype=np.int32)
+        covered[new] = place
+        return np.count_nonzero(covered[new] == place)
+
+    if target_coverage is not None:
+        count = _stamp_to_target(stamp, (H, W), r, target_coverage, rng, batch, placement)
+    else:
+        num_spots = int(H * W * (val / 100.0))
+        if placement == "poisson":
+            ys, xs, placed = poisson_disk_centers((H, W), np.full(num_spots, r), rng)
+            centers = (ys * W + xs)[placed]
+        else:
+            centers = rng.choice(H * W, size=num_spots, replace=False)
+        count = 0
+        with instrument.stage("overlay"):
+            for start in range(0, centers.size, batch):
+                count += stamp(centers[start:start + batch])
+    return (overlay, count / (H * W) * 100) if return_coverage else overlay
+
+
+def _stamp_to_target(stamp, shape, r, target_coverage, rng, batch, placement):
+    """Stamp disks until target_coverage percent of the map is covered; returns the pixel count."""
+    if not 0 <= target_coverage <= 100:
+        raise ValueError(f"target_coverage must be a percentage, not {target_coverage!r}")
+    H, W = shape
+    target = int(np.ceil(H * W * target_coverage / 100.0))
+    area = disk_footprint(r)[0].size
+    if placement == "poisson":
+        # disjoint disks: target / area of them do it, bar clipping at the edges
+        ys, xs, placed = poisson_disk_centers(shape, np.full(int(target / area * 1.1) + 16, r),
+                                              rng)
+        pool = (ys * W + xs)[placed]
+    count = used = 0
+    with instrument.stage("overlay"):
+        while count < target:
+            # a disk newly covers at most area pixels: a batch overshoots by under a disk
+            k = min(batch, -(-(target - count) // area))
+            if placement == "poisson":
+                if used >= pool.size:
+                    break
+                centers, used = pool[used:used + k], used + k
+            else:
+                centers = rng.integers(0, H * W, k)
+            count += stamp(centers)
+    return count
+
+
+def _poisson_circles(rng, shape, r, ccx, ccy, cluster_size, per_cluster, num_single):
+    """Non-overlapping circle centers (cx, cy): clusters first, then single spots."""
+    H, W = shape
+    ir = int(r)
+    num_cluster = ccx.size * per_cluster
+
+    def propose(idx):
+        # single spots anywhere in the interior, cluster spots around their center
+        ys = rng.integers(ir + 1, H - ir - 1, idx.size)
+        xs = rng.integers(ir + 1, W - ir - 1, idx.size)
+        clustered = idx < num_cluster
+        c = idx[clustered] // per_cluster
+        off = rng.integers(-cluster_size, cluster_size, size=(2, c.size), endpoint=True)
+        ys[clustered] = ccy[c] + off[1]
+        xs[clustered] = ccx[c] + off[0]
+        return ys, xs
+
+    radii = np.full(num_cluster + num_single, float(r))
+    ys, xs, placed = poisson_disk_centers(shape, radii, rng, propose)
+    return xs[placed], ys[placed]
+
+
+@lru_cache(maxsize=None)
+def circle_footprint(rad):
+    """Pixel offsets around a circle center and their coverage alpha."""
+    d = np.arange(-int(rad) - 1, int(rad) + 2)
+    dy, dx = np.meshgrid(d, d, indexing='ij')
+    dist = np.hypot(dx, dy)
+    alpha = np.where(dist <= rad - 0.5, 1.0, rad - dist + 0.5)
+    inside = dist <= rad
+    footprint = (dy[inside], dx[inside], alpha[inside])
+    for a in footprint:
+        a.setflags(write=False)
+    return footprint
+
+
+def composite_circles(base_map, cx, cy, rad, spot_color, return_coverage=False):
+    """
+    Alpha-blend circles of radius rad centred at (cx, cy) onto base_map in
+    one pass. All circles share spot_color, so stacking them is the same as
+    blending once with 1 - prod(1 - alpha) per pixel, in any order.
+    return_coverage=True returns (overlay, percent of pixels under a circle).
+    """
+    H, W, _ = base_map.shape
+    dy, dx, alpha = circle_footprint(rad)
+    ys = (np.asarray(cy)[:, None] + dy).ravel()
+    xs = (np.asarray(cx)[:, None] + dx).ravel()
+    a = np.broadcast_to(alpha, (len(cx), alpha.size)).ravel()
+    keep = (xs >= 0) & (xs < W) & (ys >= 0) & (ys < H)
+    idx = ys[keep] * W + xs[keep]
+    a = a[keep]
+    # transmittance = prod(1 - alpha); fully opaque pixels are counted apart
+    opaque = np.bincount(idx[a >= 1], minlength=H * W) > 0
+    log_t = np.bincount(idx[a < 1], weights=np.log1p(-a[a < 1]), minlength=H * W)
+    overlay = base_map.copy()
+    scale = _full_scale(overlay.dtype)
+    work = float if scale == 1.0 else np.float32  # uint8 maps blend in float32
+    trans = np.where(opaque, 0.0, np.exp(log_t)).astype(work, copy=False).reshape(H, W, 1)
+    rgb = trans * base_map[:, :, :3] + (1 - trans) * (scale * np.asarray(spot_color, work))
+    overlay[:, :, :3] = rgb if scale == 1.0 else np.rint(rgb)
+    if return_coverage:
+        # every footprint pixel has alpha >= 0.5, so log_t < 0 marks the partly covered
+        return overlay, np.count_nonzero(opaque | (log_t < 0)) / (H * W) * 100
+    return overlay
+
+
+def overlay_smooth_circles(base_map, val, spot_color,
+                           r=2.5, cluster_size=7, cluster_count=8, single_fraction=0.5,
+                           rng=None, placement="random", return_coverage=False):
+    """
+    Blend H*W*val/100 anti-aliased circles of radius r onto base_map:
+    single_fraction of them at distinct random pixels, the rest spread over
+    cluster_count clusters within +-cluster_size pixels of their centers.
+    With placement="poisson" no two circles overlap, so a cluster only
+    keeps the circles that fit in its window. return_coverage=True returns
+    (overlay, covered percent).
+    """
+    _check_placement(placement)
+    rng = np.random.default_rng() if rng is None else rng
+    H, W, _ = base_map.shape
+    num_spots = int(H * W * (val / 100.0))
+    num_single = int(num_spots * single_fraction)
+    num_cluster = num_spots - num_single
+    per_cluster = max(1, num_cluster // cluster_count)
+    ir = int(r)
+
+    # cluster spots
+    ccx = rng.integers(ir + 5, W - ir - 5, size=cluster_count, endpoint=True)
+    ccy = rng.integers(ir + 5, H - ir - 5, size=cluster_count, endpoint=True)
+    if placement == "poisson":
+        cx, cy = _poisson_circles(rng, (H, W), r, ccx, ccy, cluster_size, per_cluster,
+                                  num_single)
+        with instrument.stage("overlay"):
+            return composite_circles(base_map, cx, cy, r, spot_color, return_coverage)
+    off = rng.integers(-cluster_size, cluster_size, size=(2, cluster_count, per_cluster),
+                       endpoint=True)
+    cx = (ccx[:, None] + off[0]).ravel()
+    cy = (ccy[:, None] + off[1]).ravel()
+
+    # single spots at distinct interior pixels
+    nx, ny = W - 2 * ir - 2, H - 2 * ir - 2
+    pick = rng.choice(nx * ny, size=min(num_single, nx * ny), replace=False)
+    sx, sy = np.divmod(pick, ny)
+
+    with instrument.stage("overlay"):
+        return composite_circles(base_map,
+                                 np.concatenate([cx, sx + ir + 1]),
+                                 np.concatenate([cy, sy + ir + 1]),
+                                 r, spot_color, return_coverage)
@@ -0,0 +1,477 @@
+"""
+Figure builders for every visualization type, one catalyst per figure.
+
+Figures are plain matplotlib.figure.Figure objects saved through the Agg
+canvas, never through pyplot, so nothing opens a window and finished
+figures do not pile up in pyplot's registry during long batch runs.
+
+A catalyst is a dict with Weak/Medium/High percentages, Fresh/Reduced
+dispersion values and an optional name (see catmap.table). index picks the
+palette, cycling like the demos; seed makes the random maps reproducible;
+compact builds the maps as float32 intensity and uint8 RGBA and
+mode="quantile" makes gradient maps hit the level shares exactly (see
+catmap.gradient). The raster builders always use the compact maps.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from . import instrument
+from .palettes import (CYLINDER_PALETTES, FRESH_COLOR, GRADIENT_PALETTES, LEVELS,
+                       REDUCED_COLOR, SPOT_COLORS)
+
+KINDS = ("heatmap", "sphere", "cylinder", "dispersion", "combined")
+
+
+def _cycle(palettes, index):
+    return palettes[index % len(palettes)]
+
+
+def _new_figure(figsize):
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+def _frame(ax, linewidth):
+    for spine in ax.spines.values():
+        spine.set_visible(True)
+        spine.set_linewidth(linewidth)
+        spine.set_edgecolor('black')
+
+
+def _name(catalyst, index):
+    return catalyst.get("name") or f"Catalyst {index + 1}"
+
+
+def _levels_title(catalyst, index):
+    return (f"{_name(catalyst, index)}\n"
+            f"Weak: {catalyst['Weak']:.1f}%, Medium: {catalyst['Medium']:.1f}%, "
+            f"High: {catalyst['High']:.1f}%")
+
+
+def heatmap_figure(catalyst, index=0, seed=None, size=200, smoothness=10, compact=False,
+                   mode="labels"):
+    """Gradient elemental map with a colorbar for the levels present."""
+    from matplotlib.cm import ScalarMappable
+    from .gradient import create_gradient_distribution, palette_cmap
+
+    colors = _cycle(GRADIENT_PALETTES, index)
+    fig = _new_figure((6, 5))
+    ax = fig.add_subplot()
+    ax.imshow(create_gradient_distribution(catalyst, colors, size=size,
+                                           smoothness=smoothness, seed=seed, compact=compact,
+                                           mode=mode),
+              interpolation='gaussian')
+    _frame(ax, 1.5)
+    ax.set_title(_levels_title(catalyst, index))
+    ax.axis('off')
+
+    cb = fig.colorbar(ScalarMappable(cmap=palette_cmap(colors)), ax=ax, fraction=0.046, pad=0.04)
+    present = [(pos, level) for pos, level in zip((0.1, 0.5, 0.9), LEVELS) if catalyst[level] > 0]
+    cb.set_ticks([pos for pos, _ in present])
+    cb.set_ticklabels([level for _, level in present])
+    return fig
+
+
+def _zbuffer_image(mesh, pixels, extent=None):
+    from .raster3d import render_surface
+
+    H, W = (pixels, pixels) if np.isscalar(pixels) else pixels
+    return render_surface(mesh, width=W, height=H, elev=30, azim=45, extent=extent,
+                          background=(1.0, 1.0, 1.0, 1.0))
+
+
+def _image_axes(fig, image, title):
+    """Show a pre-rendered 3D image in plain axes, for backend='zbuffer'."""
+    ax = fig.add_subplot()
+    ax.imshow(image, interpolation='antialiased')
+    ax.set_title(title, fontsize=12)
+    ax.set_axis_off()
+    return ax
+
+
+def _lod_counts(full, extent_px):
+    from .lod import mesh_counts
+    return full if extent_px is None else mesh_counts(extent_px, full)
+
+
+# share of a z-buffer image's shorter side the sphere's and the cylinder's
+# diameter take up; used to pick their level of detail
+SPHERE_FILL = 0.7
+CYLINDER_FILL = 0.5
+
+
+def _image_extent(pixels, fill):
+    return min(np.broadcast_to(pixels, 2)) * fill
+
+
+def _sphere_mesh(catalyst, index, seed, n_u, n_v):
+    from .sphere import build_textured_sphere
+
+    return build_textured_sphere(catalyst, _cycle(GRADIENT_PALETTES, index), n_u=n_u, n_v=n_v,
+                                 rng=np.random.default_rng(seed))
+
+
+def sphere_figure(catalyst, index=0, seed=None, n_u=100, n_v=50, backend="mplot3d",
+                  pixels=900, dpi=None):
+    """
+    Textured sphere with Weak/Medium/High vertex textures. backend="zbuffer"
+    draws it with catmap.raster3d at pixels (int or (H, W)) instead of
+    mplot3d's plot_surface. The mesh is reduced from n_u x n_v to the
+    detail the image can show (see catmap.lod): the z-buffer image's
+    pixels, or for mplot3d the axes size at the output dpi, if given.
+    """
+    from .lod import surface_pixels
+
+    fig = _new_figure((6, 6))
+    if backend == "zbuffer":
+        counts = _lod_counts((n_u, n_v), _image_extent(pixels, SPHERE_FILL))
+        mesh = _sphere_mesh(catalyst, index, seed, *counts)
+        _image_axes(fig, _zbuffer_image(mesh, pixels, extent=1.4), _levels_title(catalyst, index))
+        return fig
+    ax = fig.add_subplot(projection='3d')
+    n_u, n_v = _lod_counts((n_u, n_v), None if dpi is None else surface_pixels(ax, dpi))
+    x, y, z, facecolors = _sphere_mesh(catalyst, index, seed, n_u, n_v)
+    counts = {} if dpi is None else dict(rcount=n_u, ccount=n_v)
+    with instrument.stage("plot_surface"):
+        ax.plot_surface(x, y, z, facecolors=facecolors, alpha=0.9, linewidth=0,
+                        antialiased=True, shade=True, **counts)
+    ax.set_xlim(-1.4, 1.4)
+    ax.set_ylim(-1.4, 1.4)
+    ax.set_zlim(-1.4, 1.4)
+    ax.set_title(_levels_title(catalyst, index), fontsize=12)
+    ax.set_axis_off()
+    ax.view_init(elev=30, azim=45)
+    return fig
+
+
+def _cylinder_mesh(catalyst, index, seed, n_u, n_v, smoothness, bump_scale, compact, mode,
+                   counts=None):
+    """Cylinder mesh and colors; the texture is made at n_v x n_u, then resampled to counts."""
+    from .cylinder import build_cylinder
+    from .gradient import colorize, gradient_intensity
+    from .lod import resample_texture
+
+    intensity_map = gradient_intensity(catalyst, size=(n_v, n_u), smoothness=smoothness,
+                                       seed=seed, compact=compact, mode=mode)
+    if counts is not None:
+        intensity_map = resample_texture(intensity_map, (counts[1], counts[0]))
+    colored_map = colorize(intensity_map, _cycle(CYLINDER_PALETTES, index), compact)
+    if compact:
+        colored_map = colored_map / np.float32(255)  # facecolors must be floats
+    return build_cylinder(intensity_map, bump_scale=bump_scale) + (colored_map,)
+
+
+def cylinder_figure(catalyst, index=0, seed=None, n_u=300, n_v=100, smoothness=8,
+                    bump_scale=0.0, compact=False, mode="labels", backend="mplot3d",
+                    pixels=(750, 1050), dpi=None):
+    """
+    Cylinder wrapped with the catalyst's gradient map. backend="zbuffer"
+    draws it with catmap.raster3d at pixels (int or (H, W)). The level of
+    detail is picked as for sphere_figure.
+    """
+    from .lod import surface_pixels
+
+    fig = _new_figure((7, 5))
+    mesh = (catalyst, index, seed, n_u, n_v, smoothness, bump_scale, compact, mode)
+    if backend == "zbuffer":
+        counts = _lod_counts((n_u, n_v), _image_extent(pixels, CYLINDER_FILL))
+        X, Y, Z, colored_map = _cylinder_mesh(*mesh, counts=counts)
+        _image_axes(fig, _zbuffer_image((X, Y, Z, colored_map), pixels),
+                    _levels_title(catalyst, index))
+        return fig
+    ax = fig.add_subplot(projection='3d')
+    counts = _lod_counts((n_u, n_v), None if dpi is None else surface_pixels(ax, dpi))
+    X, Y, Z, colored_map = _cylinder_mesh(*mesh, counts=counts)
+    with instrument.stage("plot_surface"):
+        ax.plot_surface(X, Y, Z, facecolors=colored_map, rcount=counts[1], ccount=counts[0],
+                        linewidth=0, antialiased=False)
+    ax.set_title(_levels_title(catalyst, index), fontsize=12)
+    ax.set_axis_off()
+    ax.view_init(elev=30, azim=45)
+    return fig
+
+
+def dispersion_figure(catalyst, index=0, seed=None, size=200, compact=False,
+                      placement="random"):
+    """Fresh vs reduced Ni dispersion map with the values annotated."""
+    from matplotlib.patches import Patch
+    from .dispersion import create_dispersion_distribution
+
+    fresh, reduced = catalyst["Fresh"], catalyst["Reduced"]
+    rgba, fp, rp = create_dispersion_distribution(
+        fresh, reduced, FRESH_COLOR, REDUCED_COLOR, size=size,
+        rng=np.random.default_rng(seed), compact=compact, placement=placement
+    )
+    fig = _new_figure((6, 6))
+    ax = fig.add_subplot()
+    ax.imshow(rgba, interpolation='nearest')
+    ax.set_title(_name(catalyst, index), fontsize=12, pad=10)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    _frame(ax, 1)
+
+    box = dict(facecolor='white', alpha=0.7)
+    ax.text(0.05, 0.92, f"Fresh (F): {fresh} ({fp:.1f}%)",
+            transform=ax.transAxes, fontsize=10, bbox=box)
+    ax.text(0.05, 0.84, f"Reduced (R): {reduced} ({rp:.1f}%)",
+            transform=ax.transAxes, fontsize=10, bbox=box)
+    ax.text(0.05, 0.76, f"Total: {(fresh + reduced):.2f}",
+            transform=ax.transAxes, fontsize=10, fontweight='bold', bbox=box)
+    fig.legend(handles=[Patch(facecolor=FRESH_COLOR, edgecolor='black', label='Fresh (F)'),
+                        Patch(facecolor=REDUCED_COLOR, edgecolor='black', label='Reduced (R)')],
+               loc='lower center', ncol=2)
+    return fig
+
+
+def combined_figure(catalyst, index=0, seed=None, size=200, smoothness=2, r=1,
+                    compact=False, mode="labels", placement="random"):
+    """Gradient map with fine Ni particles, Fresh and Reduced side by side."""
+    from .gradient import create_gradient_distribution
+    from .particles import overlay_circular_particles
+
+    base = create_gradient_distribution(catalyst, _cycle(GRADIENT_PALETTES, index),
+                                        size=size, smoothness=smoothness, seed=seed,
+                                        compact=compact, mode=mode)
+    rng = np.random.default_rng(seed)
+    fig = _new_figure((10, 5))
+    axs = fig.subplots(1, 2)
+    for ax, kind in zip(axs, ("Fresh", "Reduced")):
+        image = overlay_circular_particles(base, catalyst[kind], _cycle(SPOT_COLORS, index),
+                                           r=r, rng=rng, placement=placement)
+        ax.imshow(image)
+        ax.set_title(f"{_name(catalyst, index)} – {kind}")
+        ax.axis('off')
+    return fig
+
+
+FIGURES = {
+    "heatmap": heatmap_figure,
+    "sphere": sphere_figure,
+    "cylinder": cylinder_figure,
+    "dispersion": dispersion_figure,
+    "combined": combined_figure,
+}
+
+
+def render_figure(kind, catalyst, index=0, seed=None, **options):
+    """Build the figure of the given kind (one of KINDS) for one catalyst."""
+    try:
+        build = FIGURES[kind]
+    except KeyError:
+        raise ValueError(f"unknown figure kind {kind!r}, expected one of {KINDS}") from None
+    return build(catalyst, index=index, seed=seed, **options)
+
+
+def save_figure(fig, path, dpi=150):
+    """Save through the Agg-based file canvases; nothing is displayed."""
+    with instrument.stage("savefig"):
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+
+def figure_png(fig, dpi=None):
+    """PNG bytes of fig, cropped like save_figure."""
+    import io
+
+    buf = io.BytesIO()
+    with instrument.stage("savefig"):
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches='tight')
+    return buf.getvalue()
+
+
+class _PixelSink:
+    """File-like savefig target that keeps the Agg buffer it is handed instead of copying it."""
+    rgba = None
+
+    def write(self, data):
+        self.rgba = memoryview(data)
+
+    def seek(self, *args):
+        return 0
+
+
+def figure_rgba(fig, dpi=None):
+    """
+    Render fig, cropped like save_figure, and return {"width", "height",
+    "rgba"}: rgba is a memoryview of the renderer's (height, width, 4)
+    uint8 pixels, with no PNG encode and no copy.
+    """
+    sink = _PixelSink()
+    with instrument.stage("savefig"):
+        fig.savefig(sink, format="rgba", dpi=dpi, bbox_inches='tight')
+    height, width = sink.rgba.shape[:2]
+    return {"width": width, "height": height, "rgba": sink.rgba}
+
+
+# ─── Raster output (no figure, see catmap.export) ──────────────────────────
+
+def heatmap_raster(catalyst, index=0, seed=None, size=200, smoothness=10, mode="labels"):
+    """Gradient map array with its legend swatches; smooth, so resampled bilinearly."""
+    from .gradient import create_gradient_distribution
+
+    colors = _cycle(GRADIENT_PALETTES, index)
+    image = create_gradient_distribution(catalyst, colors, size=size,
+                                         smoothness=smoothness, seed=seed, compact=True,
+                                         mode=mode)
+    return image, colors, list(LEVELS), 'bilinear'
+
+
+def dispersion_raster(catalyst, index=0, seed=None, size=200, placement="random"):
+    """Fresh vs reduced dispersion array with a Fresh/Reduced legend."""
+    from matplotlib.colors import to_rgb
+    from .dispersion import create_dispersion_distribution
+
+    rgba, fp, rp = create_dispersion_distribution(
+        catalyst["Fresh"], catalyst["Reduced"], FRESH_COLOR, REDUCED_COLOR, size=size,
+        rng=np.random.default_rng(seed), compact=True, placement=placement
+    )
+    return (rgba, [to_rgb(FRESH_COLOR), to_rgb(REDUCED_COLOR)],
+            [f"Fresh ({fp:.1f}%)", f"Reduced ({rp:.1f}%)"], 'nearest')
+
+
+def combined_raster(catalyst, index=0, seed=None, size=200, smoothness=2, r=1,
+                    mode="labels", placement="random"):
+    """Fresh and Reduced particle overlays side by side, as in combined_figure."""
+    from .gradient import create_gradient_distribution
+    from .particles import overlay_circular_particles
+
+    colors = _cycle(GRADIENT_PALETTES, index)
+    base = create_gradient_distribution(catalyst, colors, size=size,
+                                        smoothness=smoothness, seed=seed, compact=True,
+                                        mode=mode)
+    rng = np.random.default_rng(seed)
+    panels = [overlay_circular_particles(base, catalyst[kind], _cycle(SPOT_COLORS, index),
+                                         r=r, rng=rng, placement=placement)
+              for kind in ("Fresh", "Reduced")]
+    return np.concatenate(panels, axis=1), colors, list(LEVELS), 'nearest'
+
+
+def sphere_raster(catalyst, index=0, seed=None, n_u=100, n_v=50, pixels=600):
+    """
+    Z-buffered textured sphere (see catmap.raster3d) with its level swatches;
+    the mesh detail follows the image size (see catmap.lod).
+    """
+    colors = _cycle(GRADIENT_PALETTES, index)
+    counts = _lod_counts((n_u, n_v), _image_extent(pixels, SPHERE_FILL))
+    image = _zbuffer_image(_sphere_mesh(catalyst, index, seed, *counts), pixels, extent=1.4)
+    return image, colors, list(LEVELS), 'bilinear'
+
+
+def cylinder_raster(catalyst, index=0, seed=None, n_u=300, n_v=100, smoothness=8,
+                    bump_scale=0.0, mode="labels", pixels=(600, 840)):
+    """Z-buffered gradient cylinder with its level swatches, mesh detail as for the sphere."""
+    counts = _lod_counts((n_u, n_v), _image_extent(pixels, CYLINDER_FILL))
+    mesh = _cylinder_mesh(catalyst, index, seed, n_u, n_v, smoothness, bump_scale, False, mode,
+                          counts)
+    return (_zbuffer_image(mesh, pixels), _cycle(CYLINDER_PALETTES, index), list(LEVELS),
+            'bilinear')
+
+
+RASTERS = {
+    "heatmap": heatmap_raster,
+    "sphere": sphere_raster,
+    "cylinder": cylinder_raster,
+    "dispersion": dispersion_raster,
+    "combined": combined_raster,
+}
+
+# raster kinds rendered from a 3D mesh straight at the requested pixel size
+MESH_RASTERS = ("sphere", "cylinder")
+
+
+def save_raster(kind, catalyst, path, index=0, seed=None, size=None, title=True,
+                legend=True, **options):
+    """
+    Write the map of a kind straight to a .png or .npy file, skipping
+    matplotlib's figure, resampler and savefig; sphere and cylinder are
+    z-buffered by catmap.raster3d. size = (H, W) or an int sets the map
+    size in pixels (the combined kind is two maps wide); the title and
+    legend strips are composited around it in NumPy and make the file
+    larger, so pass title=False and legend=False for an image of exactly
+    that size. Other options go to the kind's raster builder.
+    """
+    from .export import export_map
+
+    try:
+        build = RASTERS[kind]
+    except KeyError:
+        raise ValueError(f"no raster output for {kind!r}, expected one of {tuple(RASTERS)}") from None
+    if size is not None and kind in MESH_RASTERS:
+        options["pixels"] = size
+    image, swatches, labels, resample = build(catalyst, index=index, seed=seed, **options)
+    if size is not None:
+        H, W = (size, size) if np.isscalar(size) else size
+        if kind not in MESH_RASTERS:  # mesh rasters are already drawn at size
+            W = W * image.shape[1] // image.shape[0]
+        size = (H, W)
+    return export_map(image, path, size=size, resample=resample,
+                      title=_name(catalyst, index) if title else None,
+                      legend=swatches if legend else None,
+                      legend_labels=labels if legend else None)
+
+
+# kinds drawn from a gradient map, which take the mode option
+GRADIENT_KINDS = ("heatmap", "cylinder", "combined")
+
+RenderJob = namedtuple("RenderJob",
+                       "kind catalyst index seed path dpi raster size compact mode title legend",
+                       defaults=(False, None, False, "labels", True, True))
+
+
+def render_job(job):
+    """
+    Render and save one RenderJob; returns its path. Jobs with raster set
+    are written by save_raster instead of through a figure, with the title
+    and legend strips only where the job's title and legend are set. When
+    catmap.instrument is enabled, the job's stages are recorded under a
+    "render" stage tagged with the catalyst name, kind and index.
+    """
+    with instrument.context(catalyst=_name(job.catalyst, job.index), kind=job.kind,
+                            index=job.index), instrument.stage("render"):
+        return _render_job(job)
+
+
+def _render_job(job):
+    options = {"mode": job.mode} if job.kind in GRADIENT_KINDS and job.mode != "labels" else {}
+    if job.raster:
+        save_raster(job.kind, job.catalyst, job.path, index=job.index, seed=job.seed,
+                    size=job.size, title=job.title, legend=job.legend, **options)
+        return job.path
+    if job.compact and job.kind != "sphere":
+        options["compact"] = True
+    if job.kind in MESH_RASTERS:
+        options["dpi"] = job.dpi  # mesh level of detail for the saved size
+    fig = render_figure(job.kind, job.catalyst, index=job.index, seed=job.seed, **options)
+    save_figure(fig, job.path, dpi=job.dpi)
+    return job.path
+
+
+def _init_worker(profile=None):
+    import matplotlib
+    matplotlib.use("Agg")
+    if profile is not None:
+        instrument.enable(**profile)
+
+
+def render_jobs(jobs, workers=1):
+    """
+    Render jobs one figure per task, serially for workers=1 or over a pool
+    of worker processes (workers=0 uses every CPU). Paths are yielded in
+    job order. Every job carries its own seed, so a seeded run produces the
+    same files whatever the worker count. Workers append their stage records
+    to the same JSON lines file as the parent if catmap.instrument writes
+    one; hooks stay in the parent process.
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        yield from map(render_job, jobs)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                             initializer=_init_worker,
+                             initargs=(instrument.settings(),)) as pool:
+        yield from pool.map(render_job, jobs, chunksize=chunksize)
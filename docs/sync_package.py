@@ -0,0 +1,99 @@
+"""
+Copy the catmap modules the browser demos load into docs/py/catmap.
+
+GitHub Pages serves docs/ as plain static files, so the demos get their own
+copy of the package rather than a link to ../catmap. The files copied are
+the PACKAGE_MODULES list in docs/js/run_demo.js, which is also what
+Pyodide fetches; a listed module that imports an unlisted one at module
+level is reported, since the demo would fail on it. Run after changing
+catmap:
+
+    python docs/sync_package.py           # refresh docs/py/catmap
+    python docs/sync_package.py --check   # exit 1 if it is out of date
+"""
+import argparse
+import ast
+import filecmp
+import os
+import re
+import shutil
+import sys
+
+DOCS = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(DOCS, os.pardir, "catmap")
+TARGET = os.path.join(DOCS, "py", "catmap")
+RUN_DEMO = os.path.join(DOCS, "js", "run_demo.js")
+
+
+def package_modules():
+    """File names in run_demo.js's PACKAGE_MODULES."""
+    with open(RUN_DEMO, encoding="utf-8") as f:
+        block = re.search(r"PACKAGE_MODULES = \[(.*?)\];", f.read(), re.S)
+    return re.findall(r'"([^"]+\.py)"', block.group(1))
+
+
+def missing_imports(modules):
+    """(module, import) pairs where a shipped module imports an unshipped one at module level."""
+    missing = []
+    for name in modules:
+        with open(os.path.join(SOURCE, name), encoding="utf-8") as f:
+            tree = ast.parse(f.read(), name)
+        for node in tree.body:  # lazy imports inside functions are fine
+            if isinstance(node, ast.ImportFrom) and node.level == 1 and node.module:
+                needed = node.module.split(".")[0] + ".py"
+                if needed not in modules:
+                    missing.append((name, needed))
+    return missing
+
+
+def stale_files(modules):
+    """Shipped modules whose copy is missing or differs from catmap/."""
+    return [name for name in modules
+            if not os.path.isfile(os.path.join(TARGET, name))
+            or not filecmp.cmp(os.path.join(SOURCE, name), os.path.join(TARGET, name),
+                               shallow=False)]
+
+
+def extra_files(modules):
+    """Copies in docs/py/catmap that PACKAGE_MODULES no longer lists."""
+    if not os.path.isdir(TARGET):
+        return []
+    return sorted(n for n in os.listdir(TARGET) if n.endswith(".py") and n not in modules)
+
+
+def sync(modules):
+    """Rewrite docs/py/catmap to hold exactly the shipped modules."""
+    if os.path.islink(TARGET):
+        os.remove(TARGET)
+    os.makedirs(TARGET, exist_ok=True)
+    for name in extra_files(modules):
+        os.remove(os.path.join(TARGET, name))
+    for name in modules:
+        shutil.copyfile(os.path.join(SOURCE, name), os.path.join(TARGET, name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true",
+                        help="only report whether docs/py/catmap is out of date")
+    args = parser.parse_args(argv)
+
+    modules = package_modules()
+    problems = [f"{name} imports {needed}, which PACKAGE_MODULES does not list"
+                for name, needed in missing_imports(modules)]
+    if args.check:
+        if os.path.islink(TARGET):
+            problems.append("docs/py/catmap is a symlink, not a copy")
+        else:
+            problems += [f"docs/py/catmap/{name} is out of date" for name in stale_files(modules)]
+            problems += [f"docs/py/catmap/{name} is not in PACKAGE_MODULES"
+                         for name in extra_files(modules)]
+    else:
+        sync(modules)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.colors import LinearSegmentedColormap
-from matplotlib.patches import Patch
 import matplotlib.gridspec as gridspec
 
+from catmap.gradient import create_gradient_distribution, palette_cmap
+
 # Data for each catalyst
 catalysts = {
     "NiO@Ce3O4": {
@@ -40,102 +39,18 @@ catalyst_gradients = {
 grid_size = 200
 sigma = 10  # Controls the smoothness of the gradient
 
-# Function to create a more accurate gradient distribution
-def create_gradient_distribution(percentages, colors, size=200, smoothness=10):
-    # Special case for 100% single intensity
-    if percentages["Weak"] == 100 or percentages["Medium"] == 100 or percentages["High"] == 100:
-        # Create a uniform map with slight texture for visual interest
-        # Determine which intensity is 100%
-        if percentages["Weak"] == 100:
-            base_color = colors[0]
-            noise_range = 0.1  # Small noise range for texture
-        elif percentages["Medium"] == 100:
-            base_color = colors[1]
-            noise_range = 0.1
-        else:  # High == 100
-            base_color = colors[2]
-            noise_range = 0.1
-            
-        # Create base RGBA array filled with the single color
-        r, g, b = base_color
-        base_map = np.ones((size, size, 4))
-        base_map[:, :, 0] = r
-        base_map[:, :, 1] = g
-        base_map[:, :, 2] = b
-        base_map[:, :, 3] = 1.0  # Alpha channel
-        
-        # Add subtle texture with controlled random variation
-        for i in range(3):  # RGB channels only
-            noise = (np.random.rand(size, size) - 0.5) * noise_range
-            base_map[:, :, i] = np.clip(base_map[:, :, i] + noise, 0, 1)
-            
-        return base_map, percentages
-        
-    # For mixed distributions, continue with gradient approach
-    # Create an empty grid
-    intensity_map = np.zeros((size, size))
-    
-    # Calculate number of points for each intensity
-    total_cells = size * size
-    n_weak = int(total_cells * percentages["Weak"] / 100)
-    n_medium = int(total_cells * percentages["Medium"] / 100)
-    n_high = int(total_cells * percentages["High"] / 100)
-    
-    # Adjust for rounding errors
-    remainder = total_cells - (n_weak + n_medium + n_high)
-    n_weak += remainder
-    
-    # Create more accurate distribution by using intensity thresholds
-    flat_map = np.zeros(total_cells)
-    
-    # Fill with appropriate proportions
-    flat_map[:n_weak] = 0  # Weak
-    flat_map[n_weak:n_weak+n_medium] = 0.5  # Medium
-    flat_map[n_weak+n_medium:] = 1.0  # High
-    
-    # Shuffle to randomize
-    np.random.shuffle(flat_map)
-    intensity_map = flat_map.reshape((size, size))
-    
-    # Apply gaussian filter for smoother transitions
-    from scipy.ndimage import gaussian_filter
-    intensity_map = gaussian_filter(intensity_map, sigma=smoothness)
-    
-    # Normalize the intensity map to 0-1 range
-    if np.max(intensity_map) > np.min(intensity_map):  # Avoid division by zero
-        intensity_map = (intensity_map - np.min(intensity_map)) / (np.max(intensity_map) - np.min(intensity_map))
-    
-    # Create custom colormap from the gradient colors
-    cmap = LinearSegmentedColormap.from_list('custom_cmap', colors, N=256)
-    
-    # Apply colormap to intensity map
-    colored_map = cmap(intensity_map)
-    
-    # Verify the distribution by sampling points
-    sampled_map = (intensity_map * 2).round() / 2  # Round to 0, 0.5, or 1
-    unique, counts = np.unique(sampled_map, return_counts=True)
-    count_dict = dict(zip(unique, counts))
-    
-    # Calculate actual percentages
-    actual_percentages = {
-        "Weak": count_dict.get(0, 0) / total_cells * 100,
-        "Medium": count_dict.get(0.5, 0) / total_cells * 100,
-        "High": count_dict.get(1, 0) / total_cells * 100
-    }
-    
-    return colored_map, actual_percentages
-
 # Create a figure with all catalysts
 plt.figure(figsize=(16, 12))
 gs = gridspec.GridSpec(2, 2, wspace=0.3, hspace=0.4)
 
 for i, (catalyst, percentages) in enumerate(catalysts.items()):
     gradient_colors = catalyst_gradients[catalyst]
-    colored_map, actual_percentages = create_gradient_distribution(
+    colored_map = create_gradient_distribution(
         percentages, 
         gradient_colors, 
         size=grid_size, 
-        smoothness=sigma
+        smoothness=sigma,
+        seed=i
     )
     
     # Plot in the corresponding grid position
@@ -154,7 +69,7 @@ for i, (catalyst, percentages) in enumerate(catalysts.items()):
     
     # Create correct colorbar that matches the gradient colors
     # Create a custom colormap specifically for the colorbar that accurately represents the intensity levels
-    cmap_for_colorbar = LinearSegmentedColormap.from_list('custom_cbar', gradient_colors, N=256)
+    cmap_for_colorbar = palette_cmap(gradient_colors)
     
     # Create a new axes for the colorbar
     cax = plt.colorbar(plt.cm.ScalarMappable(cmap=cmap_for_colorbar), ax=ax, fraction=0.046, pad=0.04)
@@ -172,8 +87,8 @@ plt.tight_layout(rect=[0, 0.03, 1, 0.95])
 plt.savefig('elemental_mapping_gradient.png', dpi=300, bbox_inches='tight')
 plt.show()
 
-# Individual plots for each catalyst
-for catalyst, percentages in catalysts.items():
+# Individual plots for each catalyst (same seeds, so the maps are reused from the cache)
+for idx, (catalyst, percentages) in enumerate(catalysts.items()):
     # Create a more sophisticated figure
     fig = plt.figure(figsize=(10, 8))
     gs = gridspec.GridSpec(2, 1, height_ratios=[4, 1])
@@ -183,11 +98,12 @@ for catalyst, percentages in catalysts.items():
     
     # Generate the gradient map
     gradient_colors = catalyst_gradients[catalyst]
-    colored_map, actual_percentages = create_gradient_distribution(
+    colored_map = create_gradient_distribution(
         percentages, 
         gradient_colors, 
         size=grid_size, 
-        smoothness=sigma
+        smoothness=sigma,
+        seed=idx
     )
     
     # Display the gradient map
@@ -204,7 +120,7 @@ for catalyst, percentages in catalysts.items():
     
     # Create correct colorbar that matches the gradient colors
     # Create a custom colormap specifically for the colorbar
-    cmap_for_colorbar = LinearSegmentedColormap.from_list('custom_cbar', gradient_colors, N=256)
+    cmap_for_colorbar = palette_cmap(gradient_colors)
     
     # Only include intensity levels that are present in the data
     tick_positions = []
@@ -1,52 +1,12 @@
-import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Patch
 import matplotlib.gridspec as gridspec
 
+from catmap.dispersion import create_dispersion_distribution
+
 # Grid size for the dispersion map
 grid_size = 200
 
-def create_dispersion_distribution(fresh_value, reduced_value,
-                                   fresh_color, reduced_color,
-                                   size=200):
-    """
-    Create an RGBA array with random circular spots for fresh vs reduced catalysts.
-    No blurring; spots have crisp edges.
-    """
-    rgba = np.ones((size, size, 4))  # white background, alpha=1
-
-    # compute ratios
-    total = fresh_value + reduced_value
-    fresh_ratio = fresh_value / total if total > 0 else 0
-    reduced_ratio = reduced_value / total if total > 0 else 0
-
-    # number of spots (5% coverage scaled by ratio)
-    num_fresh_spots = int(size * size * 0.05 * fresh_ratio)
-    num_reduced_spots = int(size * size * 0.05 * reduced_ratio)
-
-    def draw_spots(num_spots, color, value):
-        for _ in range(num_spots):
-            x = np.random.randint(0, size)
-            y = np.random.randint(0, size)
-            radius = np.random.randint(2, 7)
-            intensity = (0.5 + np.random.random() * 0.5) * value * 2
-            for i in range(max(0, x-radius), min(size, x+radius+1)):
-                for j in range(max(0, y-radius), min(size, y+radius+1)):
-                    d = np.hypot(i - x, j - y)
-                    if d <= radius:
-                        fade = 1 - (d / radius) ** 2
-                        rgba[j, i, :3] = np.clip(color * intensity * fade, 0, 1)
-
-    # draw fresh (green) and reduced (red) spots
-    draw_spots(num_fresh_spots, np.array(fresh_color), fresh_value)
-    draw_spots(num_reduced_spots, np.array(reduced_color), reduced_value)
-
-    # light gray background for untouched pixels
-    bg = (rgba[:, :, :3] == 1).all(axis=2)
-    rgba[bg, :3] = 0.95
-
-    return rgba, fresh_ratio * 100, reduced_ratio * 100
-
 def visualize_dispersion(ax, fresh_value, reduced_value, title,
                          fresh_color, reduced_color):
     """Plot one catalyst’s dispersion map on the given Axes."""
@@ -0,0 +1,21 @@
+"""The NumPy Gaussian blur matches scipy.ndimage.gaussian_filter."""
+import numpy as np
+import pytest
+
+from catmap.blur import numpy_gaussian_filter
+
+ndimage = pytest.importorskip("scipy.ndimage")
+
+
+@pytest.mark.parametrize("shape, sigma, truncate", [
+    ((200, 200), 2, 4.0),
+    ((37, 301), (1.5, 8), 4.0),
+    ((64, 48), 0.7, 2.5),
+    ((3, 50, 60), (0, 2, 2), 4.0),  # batch stacks blur the spatial axes only
+    ((5, 7), 4, 4.0),               # kernel wider than the map: reflected more than once
+])
+def test_matches_scipy(shape, sigma, truncate):
+    field = np.random.default_rng(0).random(shape)
+    expected = ndimage.gaussian_filter(field, sigma, truncate=truncate)
+    np.testing.assert_allclose(numpy_gaussian_filter(field, sigma, truncate=truncate),
+                               expected, rtol=0, atol=1e-12)
@@ -0,0 +1,23 @@
+"""Quantile-mode gradient maps hit the requested level shares exactly."""
+import numpy as np
+import pytest
+
+from catmap.gradient import gradient_intensity, level_counts, percentages_key
+
+SHARES = [
+    {"Weak": 59.3, "Medium": 9.43, "High": 31.27},
+    {"Weak": 33.3, "Medium": 33.3, "High": 33.4},
+    {"Weak": 0.0, "Medium": 12.5, "High": 87.5},
+    {"Weak": 100.0, "Medium": 0.0, "High": 0.0},
+]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("size", [200, (73, 311)])
+@pytest.mark.parametrize("shares", SHARES)
+def test_quantile_mode_exact_counts(shares, size, compact):
+    intensity = gradient_intensity(shares, size=size, smoothness=3, seed=7, compact=compact,
+                                   mode="quantile")
+    # the pixel counts measure_percentages sees after the blur, not just close
+    counts = np.bincount(np.rint(intensity * 2).astype(np.intp).ravel(), minlength=3)
+    assert tuple(counts) == level_counts(percentages_key(shares), intensity.size)
@@ -0,0 +1,62 @@
+"""Coverage counted while stamping equals the coverage visible in the image."""
+import numpy as np
+import pytest
+
+from catmap.dispersion import create_dispersion_distribution
+from catmap.particles import overlay_circular_particles, overlay_smooth_circles
+
+SPOT = (0.9, 0.1, 0.1)
+
+
+def _base(shape=(120, 150), compact=False):
+    base = np.full(shape + (4,), 0.5)
+    base[..., 3] = 1.0
+    return np.rint(base * 255).astype(np.uint8) if compact else base
+
+
+def _changed(overlay, base):
+    """Percent of pixels the overlay changed."""
+    return (overlay != base).any(axis=-1).mean() * 100
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("placement", ["random", "poisson"])
+@pytest.mark.parametrize("r", [1, 3])
+def test_circular_coverage(r, placement, compact):
+    base = _base(compact=compact)
+    overlay, coverage = overlay_circular_particles(base, 4.0, SPOT, r=r, placement=placement,
+                                                   rng=np.random.default_rng(1), batch=64,
+                                                   return_coverage=True)
+    assert coverage == pytest.approx(_changed(overlay, base), abs=1e-9)
+
+
+@pytest.mark.parametrize("placement", ["random", "poisson"])
+def test_target_coverage(placement):
+    base = _base()
+    overlay, coverage = overlay_circular_particles(base, 0, SPOT, r=2, placement=placement,
+                                                   rng=np.random.default_rng(2),
+                                                   target_coverage=20, return_coverage=True)
+    assert coverage == pytest.approx(_changed(overlay, base), abs=1e-9)
+    # overshoot stays under one disk's area (13 pixels at r=2)
+    assert 20 <= coverage < 20 + 13 / base[..., 0].size * 100
+
+
+@pytest.mark.parametrize("placement", ["random", "poisson"])
+def test_smooth_circle_coverage(placement):
+    base = _base()
+    overlay, coverage = overlay_smooth_circles(base, 1.0, SPOT, placement=placement,
+                                               rng=np.random.default_rng(3),
+                                               return_coverage=True)
+    assert coverage == pytest.approx(_changed(overlay, base), abs=1e-9)
+
+
+@pytest.mark.parametrize("placement", ["random", "poisson"])
+def test_dispersion_coverage(placement):
+    rgba, _, _, (fresh, reduced) = create_dispersion_distribution(
+        0.8, 0.19, (0.2, 0.6, 0.9), (0.9, 0.4, 0.1), size=150, placement=placement,
+        rng=np.random.default_rng(4), return_coverage=True)
+    # untouched pixels get the 0.95 gray background (spot rims fade to black,
+    # so the image alone cannot tell fresh from reduced pixels there)
+    spots = (rgba[..., :3] != 0.95).any(axis=-1).mean() * 100
+    assert fresh + reduced == pytest.approx(spots, abs=1e-9)
+    assert fresh > 0 and reduced > 0